@@ -35,13 +35,93 @@ AI客户端模块 - AI Client Module
     # }
 """
 
-from typing import Dict
+import asyncio
+import functools
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from infrastructure.config import config
 from infrastructure.logger import logger
 from domain.exceptions import AIError, ConfigError
 
 
+@functools.lru_cache(maxsize=None)
+def _get_openai():
+    """
+    延迟导入openai模块
+
+    返回:
+        module: openai模块
+
+    抛出:
+        ImportError: openai库未安装
+
+    说明:
+        openai包含上百个子模块,冷启动导入耗时数百毫秒。
+        推迟到首次创建客户端时才导入,之后直接复用缓存的模块对象;
+        导入失败不会被缓存,安装后可再次尝试。
+    """
+    import openai
+    return openai
+
+
+# 意图分析结果缓存的最大条目数
+_INTENT_CACHE_SIZE = 1024
+
+# 意图分析的结构化输出格式,服务端按schema约束解码,返回结果必然可解析且字段齐全
+_INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": ["搜索", "安装", "查询"]},
+        "keyword": {"type": "string"},
+        "category": {"type": "string"},
+    },
+    "required": ["intent", "keyword", "category"],
+    "additionalProperties": False,
+}
+_INTENT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "intent", "schema": _INTENT_SCHEMA, "strict": True},
+}
+# 端点不支持json_schema时退回的格式
+_JSON_OBJECT_RESPONSE_FORMAT = {"type": "json_object"}
+
+# 按(构造器, api_key, base_url)复用的OpenAI客户端池
+_client_pool: Dict[Tuple, object] = {}
+_client_pool_lock = threading.Lock()
+
+
+def _get_openai_client(api_key: str, base_url: str):
+    """
+    获取共享的OpenAI客户端实例
+
+    参数:
+        api_key: API密钥
+        base_url: API端点URL
+
+    返回:
+        openai.OpenAI: 相同密钥和端点共享的客户端实例
+
+    抛出:
+        ImportError: openai库未安装
+
+    说明:
+        每个openai.OpenAI内部持有独立的httpx连接池,
+        为每个QiniuClient新建实例会重复TCP+TLS握手。
+        相同(api_key, base_url)复用同一实例,保持长连接。
+        键中包含OpenAI构造器本身,SDK被替换(如测试打桩)时不会拿到旧实例。
+    """
+    factory = _get_openai().OpenAI
+    key = (factory, api_key, base_url)
+    with _client_pool_lock:
+        client = _client_pool.get(key)
+        if client is None:
+            client = factory(api_key=api_key, base_url=base_url)
+            _client_pool[key] = client
+        return client
+
+
 class AIClient(ABC):
     """
     AI客户端抽象基类
@@ -81,6 +161,9 @@ class QiniuClient(AIClient):
     属性:
         client: OpenAI SDK客户端实例(七牛云兼容OpenAI接口)
         model: 使用的模型名称
+        _intent_cache: 规范化输入 -> 意图分析结果的LRU缓存
+        _async_client: (事件循环, 异步SDK客户端),在每个事件循环中首次异步调用时创建
+        _structured_output: 是否使用json_schema结构化输出(端点不支持时自动关闭)
     
     说明:
         使用七牛云的大模型推理服务进行自然语言理解。
@@ -102,17 +185,23 @@ class QiniuClient(AIClient):
         说明:
             需要先安装: pip install openai
             七牛云提供 OpenAI 兼容接口,可直接使用 OpenAI SDK
+            相同密钥和端点的客户端共享同一个SDK实例及其连接池
         """
         try:
-            import openai
-            self.client = openai.OpenAI(api_key=api_key, base_url=base_url)
-            self.model = model
-            logger.debug(f"七牛云AI客户端初始化成功 - 端点: {base_url}, 模型: {model}")
+            self.client = _get_openai_client(api_key, base_url)
         except ImportError:
             raise ConfigError(
                 "OpenAI库未安装",
                 detail="请运行: pip install openai"
             )
+        self.model = model
+        self._api_key = api_key
+        self._base_url = base_url
+        self._async_client = None
+        self._structured_output = True
+        self._intent_cache: OrderedDict = OrderedDict()
+        self._intent_cache_lock = threading.Lock()
+        logger.debug("七牛云AI客户端初始化成功 - 端点: %s, 模型: %s", base_url, model)
     
     def analyze_intent(self, user_input: str) -> Dict[str, str]:
         """
@@ -131,14 +220,16 @@ class QiniuClient(AIClient):
             Exception: API调用失败时抛出异常,不再使用降级策略
         
         工作流程:
+        0. 命中缓存(去除首尾空白、合并空白并转小写后的输入)时直接返回
         1. 构建提示词(Prompt Engineering)
         2. 调用七牛云大模型 API
         3. 解析JSON响应
         4. 失败时抛出异常(不再降级)
         
         提示词设计:
-            采用结构化输出,要求AI返回JSON格式,
-            便于程序解析和处理。
+            采用结构化输出(json_schema),服务端按schema约束解码,
+            返回的JSON必然包含intent/keyword/category;
+            端点不支持时自动退回json_object格式。
         
         示例:
             输入: "帮我找一个可以画流程图的工具"
@@ -148,6 +239,145 @@ class QiniuClient(AIClient):
                 'category': '绘图'
             }
         """
+        cache_key = self._intent_cache_key(user_input)
+        cached = self._get_cached_intent(cache_key, user_input)
+        if cached is not None:
+            return cached
+        
+        try:
+            logger.debug("调用七牛云大模型分析用户意图: %s", user_input)
+            
+            try:
+                response = self.client.chat.completions.create(
+                    **self._build_intent_request(user_input)
+                )
+            except Exception as e:
+                if not self._disable_structured_output(e):
+                    raise
+                response = self.client.chat.completions.create(
+                    **self._build_intent_request(user_input)
+                )
+            result = self._parse_intent_response(response)
+            
+            logger.debug("七牛云AI分析成功: %s", result)
+            
+        except Exception as e:
+            logger.error("七牛云AI调用失败: %s", e, exc_info=True)
+            raise AIError(
+                "AI模型推理失败",
+                detail=str(e),
+                context={'model': self.model, 'input': user_input[:50]}
+            )
+        
+        self._store_intent(cache_key, result)
+        return result
+    
+    async def analyze_intent_async(self, user_input: str) -> Dict[str, str]:
+        """
+        异步分析用户意图
+        
+        参数:
+            user_input: 用户的自然语言输入
+        
+        返回:
+            Dict[str, str]: 分析结果,格式同analyze_intent
+        
+        抛出:
+            AIError: API调用失败
+        
+        说明:
+            使用openai.AsyncOpenAI发起请求,等待网络响应期间不阻塞事件循环,
+            与analyze_intent共享提示词、解析逻辑和结果缓存。
+            异步客户端在首次调用时创建,应在同一个事件循环中使用。
+        """
+        cache_key = self._intent_cache_key(user_input)
+        cached = self._get_cached_intent(cache_key, user_input)
+        if cached is not None:
+            return cached
+        
+        try:
+            logger.debug("异步调用七牛云大模型分析用户意图: %s", user_input)
+            
+            aclient = self._get_async_client()
+            try:
+                response = await aclient.chat.completions.create(
+                    **self._build_intent_request(user_input)
+                )
+            except Exception as e:
+                if not self._disable_structured_output(e):
+                    raise
+                response = await aclient.chat.completions.create(
+                    **self._build_intent_request(user_input)
+                )
+            result = self._parse_intent_response(response)
+            
+            logger.debug("七牛云AI异步分析成功: %s", result)
+            
+        except Exception as e:
+            logger.error("七牛云AI异步调用失败: %s", e, exc_info=True)
+            raise AIError(
+                "AI模型推理失败",
+                detail=str(e),
+                context={'model': self.model, 'input': user_input[:50]}
+            )
+        
+        self._store_intent(cache_key, result)
+        return result
+    
+    async def analyze_intents_async(self, user_inputs: List[str]) -> List[Dict[str, str]]:
+        """
+        并发分析多条用户输入
+        
+        参数:
+            user_inputs: 用户输入列表
+        
+        返回:
+            List[Dict[str, str]]: 与输入一一对应的分析结果
+        
+        抛出:
+            AIError: 任一请求失败
+        
+        说明:
+            通过asyncio.gather并发提交,总耗时约为最慢一次请求的耗时,
+            而不是各次请求耗时之和。
+        
+        示例:
+            results = asyncio.run(client.analyze_intents_async(["找绘图软件", "安装vim"]))
+        """
+        return list(await asyncio.gather(
+            *(self.analyze_intent_async(user_input) for user_input in user_inputs)
+        ))
+    
+    def _get_async_client(self):
+        """
+        获取(必要时创建)当前事件循环的异步SDK客户端
+        
+        返回:
+            openai.AsyncOpenAI: 异步客户端实例
+        
+        说明:
+            异步客户端的连接池绑定在首次使用它的事件循环上,
+            每次asyncio.run都会新建事件循环,因此按当前运行的循环缓存,
+            循环变化时重新创建(旧循环已关闭,其连接随之丢弃)。
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_client[0] is not loop:
+            self._async_client = (loop, _get_openai().AsyncOpenAI(
+                api_key=self._api_key,
+                base_url=self._base_url
+            ))
+        return self._async_client[1]
+    
+    def _build_intent_request(self, user_input: str) -> Dict:
+        """
+        构建意图分析请求参数
+        
+        参数:
+            user_input: 用户的自然语言输入
+        
+        返回:
+            Dict: chat.completions.create的关键字参数
+        """
         prompt = f"""
 分析以下用户请求,提取关键信息:
 
@@ -162,31 +392,98 @@ class QiniuClient(AIClient):
 
 只返回JSON,不要其他文字。
 """
-        
-        try:
-            logger.debug(f"调用七牛云大模型分析用户意图: {user_input}")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                response_format={"type": "json_object"}
+        return {
+            'model': self.model,
+            'messages': [{"role": "user", "content": prompt}],
+            'response_format': (
+                _INTENT_RESPONSE_FORMAT if self._structured_output
+                else _JSON_OBJECT_RESPONSE_FORMAT
             )
-            
-            import json
-            result = json.loads(response.choices[0].message.content)
-            
-            logger.debug(f"七牛云AI分析成功: {result}")
-            
-            return result
-            
-        except Exception as e:
-            logger.error(f"七牛云AI调用失败: {e}", exc_info=True)
-            raise AIError(
-                "AI模型推理失败",
-                detail=str(e),
-                context={'model': self.model, 'input': user_input[:50]}
-            )
-
+        }
+    
+    def _disable_structured_output(self, error: Exception) -> bool:
+        """
+        端点拒绝json_schema格式时关闭结构化输出
+        
+        参数:
+            error: 请求抛出的异常
+        
+        返回:
+            bool: 是否已关闭结构化输出(调用方应以json_object格式重试一次)
+        
+        说明:
+            部分OpenAI兼容端点或模型不支持json_schema,会返回400错误。
+            只有错误信息提到response_format/json_schema时才关闭,
+            其他400错误(如上下文过长、内容审核)原样抛出。
+            关闭后该客户端后续请求都使用json_object格式,不再重复试探。
+        """
+        if not self._structured_output or getattr(error, 'status_code', None) != 400:
+            return False
+        detail = f"{error} {getattr(error, 'body', None) or ''}".lower()
+        if 'response_format' not in detail and 'json_schema' not in detail:
+            return False
+        self._structured_output = False
+        logger.warning("端点不支持json_schema结构化输出,改用json_object格式: %s", error)
+        return True
+    
+    @staticmethod
+    def _parse_intent_response(response) -> Dict[str, str]:
+        """
+        解析模型返回的JSON内容
+        
+        参数:
+            response: chat.completions.create的返回值
+        
+        返回:
+            Dict[str, str]: 解析后的分析结果
+        """
+        import json
+        return json.loads(response.choices[0].message.content)
+    
+    @staticmethod
+    def _intent_cache_key(user_input: str) -> str:
+        """
+        计算缓存键: 去除首尾空白、合并空白并转小写
+        
+        参数:
+            user_input: 用户的自然语言输入
+        
+        返回:
+            str: 规范化后的输入
+        """
+        return ' '.join(user_input.split()).lower()
+    
+    def _get_cached_intent(self, cache_key: str, user_input: str) -> Optional[Dict[str, str]]:
+        """
+        查询意图分析缓存
+        
+        参数:
+            cache_key: 规范化后的输入
+            user_input: 原始输入(仅用于日志)
+        
+        返回:
+            Optional[Dict[str, str]]: 缓存结果的副本,未命中时返回None
+        """
+        with self._intent_cache_lock:
+            cached = self._intent_cache.get(cache_key)
+            if cached is None:
+                return None
+            self._intent_cache.move_to_end(cache_key)
+        logger.debug("意图分析命中缓存: %s", user_input)
+        return dict(cached)
+    
+    def _store_intent(self, cache_key: str, result: Dict[str, str]) -> None:
+        """
+        写入意图分析缓存,超出容量时淘汰最久未使用的条目
+        
+        参数:
+            cache_key: 规范化后的输入
+            result: 分析结果
+        """
+        with self._intent_cache_lock:
+            self._intent_cache[cache_key] = dict(result)
+            if len(self._intent_cache) > _INTENT_CACHE_SIZE:
+                self._intent_cache.popitem(last=False)
 
 def create_ai_client() -> AIClient:
     """
@@ -222,5 +519,5 @@ def create_ai_client() -> AIClient:
     base_url = config.get('qiniu_base_url', 'https://openai.qiniu.com/v1')
     model = config.get('qiniu_model', 'gpt-4')
     
-    logger.info(f"创建七牛云AI客户端 - 模型: {model}")
+    logger.info("创建七牛云AI客户端 - 模型: %s", model)
     return QiniuClient(api_key, base_url, model)
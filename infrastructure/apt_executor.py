@@ -4,6 +4,8 @@ APT包管理器执行器 - APT Package Manager Executor
 支持基于Debian/Ubuntu系统的apt包管理器。
 """
 
+import os
+import shutil
 import subprocess
 import json
 import re
@@ -16,6 +18,8 @@ from domain.exceptions import BrewError
 class AptExecutor(PackageManagerBase):
     """APT包管理器执行器"""
     
+    supports_info_batch = True
+    
     def __init__(self):
         self.apt_path = '/usr/bin/apt'
         self.apt_cache_path = '/usr/bin/apt-cache'
@@ -24,16 +28,14 @@ class AptExecutor(PackageManagerBase):
         return PackageManagerType.APT
     
     def is_available(self) -> bool:
-        try:
-            result = subprocess.run(
-                [self.apt_path, '--version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except Exception:
+        # 只检查可执行文件,不启动apt进程;默认路径不可用时在PATH中查找
+        if os.path.isfile(self.apt_path) and os.access(self.apt_path, os.X_OK):
+            return True
+        found = shutil.which('apt')
+        if found is None:
             return False
+        self.apt_path = found
+        return True
     
     def _execute(self, args: List[str], timeout: int = 30, use_sudo: bool = False) -> str:
         cmd = ['sudo'] if use_sudo else []
@@ -106,18 +108,7 @@ class AptExecutor(PackageManagerBase):
                 timeout=10
             ).stdout
             
-            info_dict = {}
-            for line in output.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    info_dict[key.strip().lower()] = value.strip()
-            
-            return {
-                'name': info_dict.get('package', package),
-                'desc': info_dict.get('description', ''),
-                'version': info_dict.get('version', 'unknown'),
-                'homepage': info_dict.get('homepage'),
-            }
+            return self._to_info(self._parse_fields(output.split('\n')), package)
         except Exception as e:
             logger.error(f"获取包信息失败: {e}")
             raise BrewError(
@@ -126,6 +117,44 @@ class AptExecutor(PackageManagerBase):
                 context={'package': package}
             )
     
+    def info_batch(self, packages: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        if not packages:
+            return {}
+        # 不存在的包只会在stderr报错,其余包的记录照常输出,因此不检查退出码
+        output = subprocess.run(
+            [self.apt_cache_path, 'show', *packages],
+            capture_output=True,
+            text=True,
+            timeout=10 + len(packages)
+        ).stdout
+        
+        # 每个版本一段记录,以空行分隔;同一个包有多段时与info一致取最后一段
+        found: Dict[str, Dict[str, Any]] = {}
+        for stanza in output.split('\n\n'):
+            fields = self._parse_fields(stanza.split('\n'))
+            if 'package' in fields:
+                found[fields['package']] = self._to_info(fields, fields['package'])
+        
+        return {package: found.get(package) for package in packages}
+    
+    @staticmethod
+    def _parse_fields(lines: List[str]) -> Dict[str, str]:
+        fields = {}
+        for line in lines:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                fields[key.strip().lower()] = value.strip()
+        return fields
+    
+    @staticmethod
+    def _to_info(fields: Dict[str, str], package: str) -> Dict[str, Any]:
+        return {
+            'name': fields.get('package', package),
+            'desc': fields.get('description', ''),
+            'version': fields.get('version', 'unknown'),
+            'homepage': fields.get('homepage'),
+        }
+    
     def install(self, package: str, options: Optional[Dict[str, Any]] = None) -> bool:
         try:
             logger.info(f"正在安装: {package}")
@@ -136,6 +165,19 @@ class AptExecutor(PackageManagerBase):
             logger.error(f"安装失败: {e}")
             return False
     
+    def install_batch(self, packages: List[str], options: Optional[Dict[str, Any]] = None) -> Dict[str, bool]:
+        if len(packages) <= 1:
+            return super().install_batch(packages, options)
+        try:
+            logger.info(f"正在批量安装: {', '.join(packages)}")
+            self._execute(['install', '-y', *packages], timeout=300 * len(packages), use_sudo=True)
+            logger.info(f"成功安装: {', '.join(packages)}")
+            return {package: True for package in packages}
+        except BrewError as e:
+            # apt install是原子的,任一包失败时全部未安装,逐个重试以确定每个包的结果
+            logger.warning(f"批量安装失败,改为逐个安装: {e}")
+            return super().install_batch(packages, options)
+    
     def uninstall(self, package: str) -> bool:
         try:
             logger.info(f"正在卸载: {package}")
@@ -32,6 +32,8 @@ Homebrew命令执行器 - Homebrew Command Executor
     success = brew.install('drawio', is_cask=True)
 """
 
+import os
+import shutil
 import subprocess
 import json
 from typing import List, Dict, Any, Optional
@@ -53,6 +55,8 @@ class BrewExecutor(PackageManagerBase):
         错误处理、超时控制和日志记录。
     """
     
+    supports_info_batch = True
+    
     def __init__(self):
         """
         初始化执行器
@@ -67,17 +71,23 @@ class BrewExecutor(PackageManagerBase):
         return PackageManagerType.BREW
     
     def is_available(self) -> bool:
-        """检查Homebrew是否可用"""
-        try:
-            result = subprocess.run(
-                [self.brew_path, '--version'],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except Exception:
+        """
+        检查Homebrew是否可用
+        
+        说明:
+            只检查可执行文件是否存在且可执行(与配置校验一致),
+            不启动brew进程,避免每次检测付出数百毫秒的启动开销。
+            配置的路径不可用时(如Intel Mac的/usr/local/bin/brew)
+            在PATH中查找brew,找到则改用该路径。
+        """
+        if os.path.isfile(self.brew_path) and os.access(self.brew_path, os.X_OK):
+            return True
+        found = shutil.which('brew')
+        if found is None:
             return False
+        logger.debug(f"配置的Homebrew路径不可用,改用PATH中的: {found}")
+        self.brew_path = found
+        return True
     
     def _execute(self, args: List[str], timeout: int = 30) -> str:
         """
@@ -300,6 +310,83 @@ class BrewExecutor(PackageManagerBase):
             logger.error(f"安装失败: {e}")
             return False
     
+    def install_batch(self, packages: List[str], options: Optional[Dict[str, Any]] = None) -> Dict[str, bool]:
+        """
+        批量安装软件包
+        
+        参数:
+            packages: 包名列表
+            options: 可选参数字典,支持 {'is_cask': bool},对所有包生效
+        
+        返回:
+            Dict[str, bool]: {package_name: success}
+        
+        说明:
+            执行一次 brew install [--cask] <pkg1> <pkg2> ...,
+            Homebrew的启动和索引加载只发生一次。
+            任一包安装失败时整条命令失败,此时逐个重新安装以确定每个包的结果
+            (已成功安装的包再次安装会很快返回)。
+        
+        超时设置:
+            按包数量放大安装超时(每个包5分钟)。
+        
+        示例:
+            results = brew.install_batch(['wget', 'jq'])
+            # 返回: {'wget': True, 'jq': True}
+        """
+        if len(packages) <= 1:
+            return super().install_batch(packages, options)
+        
+        args = ['install']
+        if options and options.get('is_cask', False):
+            args.append('--cask')
+        args.extend(packages)
+        
+        try:
+            self._execute(args, timeout=300 * len(packages))
+        except BrewError as e:
+            logger.warning(f"批量安装失败,改为逐个安装: {e}")
+            return super().install_batch(packages, options)
+        
+        logger.info(f"成功安装: {', '.join(packages)}")
+        return {package: True for package in packages}
+    
+    def info_batch(self, packages: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        批量获取软件包的详细信息
+        
+        参数:
+            packages: 包名列表
+        
+        返回:
+            Dict[str, Optional[Dict]]: {package_name: info},未找到的包为None
+        
+        抛出:
+            BrewError: 命令执行失败(如列表中有不存在的包)
+        
+        说明:
+            执行一次 brew info --json=v2 <pkg1> <pkg2> ...,
+            按名称、别名和旧名称把返回的formula/cask对应回请求的包名。
+            同名时与info一致,优先返回formula。
+        """
+        if not packages:
+            return {}
+        
+        data = json.loads(self._execute(['info', '--json=v2', *packages]))
+        
+        by_name: Dict[str, Dict[str, Any]] = {}
+        for cask in data.get('casks', []):
+            for name in (cask.get('token'), cask.get('full_token'), *cask.get('old_tokens', [])):
+                if name:
+                    by_name[name] = cask
+        for formula in data.get('formulae', []):
+            for name in (formula.get('name'), formula.get('full_name'),
+                         *formula.get('aliases', []), *formula.get('oldnames', [])):
+                if name:
+                    by_name[name] = formula
+        
+        return {package: by_name.get(package) for package in packages}
+    
     def list_installed(self) -> List[str]:
         """
         列出已安装的软件包
@@ -36,13 +36,237 @@
     manager.load_session()
 """
 
+import atexit
+import heapq
 import json
+import logging
+import os
+import queue
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Deque, Union
 from datetime import datetime
 from infrastructure.logger import logger
 from domain.exceptions import ConversationError
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖,缺失时回退到标准库json
+    orjson = None
+
+
+def _dump_session(session_data: Dict[str, Any], pretty: bool = False) -> bytes:
+    """
+    将会话数据序列化为UTF-8字节串
+    
+    参数:
+        session_data: 会话数据
+        pretty: 是否缩进输出(便于人工阅读,体积更大)
+    
+    说明:
+        优先使用orjson一次性生成bytes,避免str+bytes两份副本;
+        未安装orjson时回退到标准库json。
+    """
+    if orjson is not None:
+        return orjson.dumps(session_data, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(session_data, indent=2, ensure_ascii=False).encode('utf-8')
+    return json.dumps(session_data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_session(raw: bytes) -> Dict[str, Any]:
+    """
+    解析会话文件内容
+    
+    抛出:
+        json.JSONDecodeError: 内容不是合法JSON(orjson的异常也是其子类)
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _write_atomic(path: Path, payload: bytes):
+    """
+    原子地写入会话文件
+    
+    参数:
+        path: 目标文件路径
+        payload: 完整的文件内容
+    
+    说明:
+        先以一次os.write写入同目录下的临时文件并fsync,再os.replace替换目标文件,
+        进程在写入中途崩溃时不会留下损坏的会话文件。
+        每次写入使用独立的临时文件,同一会话的并发保存(如多个请求线程和后台写入线程)
+        不会互相覆盖;写入失败时删除临时文件。
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        try:
+            os.fchmod(fd, 0o644)
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+# 会话文件中history字段的键(保存时history总是最后一个字段)
+_HISTORY_KEY_RE = re.compile(rb'"history"\s*:')
+
+# 读取会话元数据时预读的字节数,元数据字段都位于文件开头
+_SESSION_HEADER_SIZE = 4096
+
+# 会话文件名后缀,列出会话时按后缀过滤并截取会话名
+_SESSION_SUFFIX = "_session.json"
+_SESSION_SUFFIX_LEN = len(_SESSION_SUFFIX)
+
+
+def _load_session_header(f) -> Dict[str, Any]:
+    """
+    只解析会话文件开头的元数据,跳过history数组
+    
+    参数:
+        f: 以二进制模式打开的会话文件
+    
+    返回:
+        Dict: 不含history的会话数据
+    
+    说明:
+        预读文件开头,在history键处截断并补全右括号后解析;
+        找不到history键或截断结果无法解析时,回退为读取整个文件。
+    """
+    head = f.read(_SESSION_HEADER_SIZE)
+    match = _HISTORY_KEY_RE.search(head)
+    
+    if match:
+        try:
+            return _load_session(head[:match.start()].rstrip().rstrip(b',') + b'}')
+        except ValueError:
+            pass
+    
+    return _load_session(head + f.read())
+
+
+def _format_timestamp(timestamp: Union[int, str, None]) -> Optional[str]:
+    """
+    将消息时间戳转换为ISO格式字符串
+    
+    参数:
+        timestamp: 新消息为time.time_ns()纳秒整数,从会话文件加载的消息为ISO字符串
+    
+    返回:
+        Optional[str]: ISO格式时间戳
+    """
+    if isinstance(timestamp, int):
+        return datetime.fromtimestamp(timestamp / 1e9).isoformat()
+    return timestamp
+
+
+# 优化后的系统提示词(常量,模块加载时构建一次)
+_OPTIMIZED_SYSTEM_PROMPT = """你是 MacMind 的 AI 助手,一个专业的 macOS 系统管理和软件管家。
+
+🔧 重要: 你拥有以下可执行的工具函数
+当用户需要执行实际操作时,你必须调用相应的工具函数,而不是仅仅描述如何操作:
+
+可用工具:
+1. search_software(query) - 搜索软件包
+2. install_software(package_name) - 安装软件
+3. list_installed_software() - 列出已安装软件
+4. open_app(app_name) - 打开应用程序
+5. quit_app(app_name) - 关闭应用程序
+6. check_app_status(app_name) - 查询应用状态
+7. get_system_info() - 获取系统信息
+
+使用工具的原则:
+- ✅ 当用户要求"搜索"、"安装"、"打开"等操作时,立即调用对应的工具函数
+- ✅ 先调用工具执行操作,再根据执行结果给出友好的回复
+- ✅ 如果操作成功,告知用户结果;如果失败,提供替代方案
+- ❌ 不要仅仅告诉用户"可以使用xx命令",而要实际执行操作
+- ❌ 不要问用户"需要我帮你安装吗",直接执行用户明确要求的操作
+
+你的能力范围:
+1. 📦 软件管理
+   - 搜索和推荐 macOS 软件 (使用 search_software)
+   - 安装软件包 (使用 install_software)
+   - 列出已安装软件 (使用 list_installed_software)
+   - 分析软件许可证,优先推荐开源软件
+
+2. 💻 系统控制
+   - 打开应用程序 (使用 open_app)
+   - 关闭应用程序 (使用 quit_app)
+   - 查询应用运行状态 (使用 check_app_status)
+   - 查询系统信息 (使用 get_system_info)
+
+3. ❓ 问题解答
+   - 解释 macOS 系统功能
+   - 提供故障排除建议
+   - 分享最佳实践
+
+交互原则:
+- 💬 用友好、简洁的语言回答
+- 🎯 精准理解用户意图,主动调用工具执行操作
+- 🛡️ 安全第一,在执行敏感操作前提醒用户
+- 💡 主动提供相关建议和替代方案
+- ✅ 确保推荐的软件具有清晰的许可证和合法性
+
+回答格式:
+- 使用适当的 emoji 提升可读性
+- 重要信息用粗体标记
+- 复杂步骤用编号列表
+- 执行工具后,总结操作结果
+
+特别提醒:
+- 当用户提到"绘图软件"、"视频编辑器"等,先调用 search_software 搜索,再推荐
+- 对于安装请求,直接调用 install_software,不要仅仅描述如何安装
+- 对于打开/关闭应用请求,直接调用 open_app/quit_app 执行操作
+
+现在,请以专业、友好的方式帮助用户,并主动使用工具执行实际操作。""".strip()
+
+
+# 消息角色常量(驻留字符串,角色比较可直接命中指针相等)
+_ROLE_USER = sys.intern("user")
+_ROLE_ASSISTANT = sys.intern("assistant")
+_ROLE_SYSTEM = sys.intern("system")
+_ROLE_TOOL = sys.intern("tool")
+
+# 连续中文字符(U+4E00~U+9FFF)的预编译正则,匹配在C层完成
+_CJK_RE = re.compile('[\u4e00-\u9fff]+')
+
+# 话题 -> 关键词映射(用于生成上下文总结)
+_TOPIC_KEYWORDS = {
+    "软件": ["搜索", "安装", "卸载", "软件", "应用"],
+    "系统控制": ["打开", "关闭", "启动", "退出"],
+    "通知管理": ["通知", "提醒", "消息"],
+    "快捷键": ["快捷键", "短按键", "键盘"],
+    "系统信息": ["版本", "信息", "状态"]
+}
+
+# 关键词 -> 话题的反向索引,以及匹配全部关键词的单个正则(长词优先),
+# 每条消息只需在C层扫描一遍即可找出所有命中的话题
+_TOPIC_BY_WORD = {
+    word: topic
+    for topic, words in _TOPIC_KEYWORDS.items()
+    for word in words
+}
+_TOPIC_RE = re.compile('|'.join(
+    re.escape(word) for word in sorted(_TOPIC_BY_WORD, key=len, reverse=True)
+))
+
 
 class ConversationManager:
     """
@@ -51,22 +275,55 @@ class ConversationManager:
     属性:
         _instance: 类级别的单例实例
         _initialized: 标记是否已初始化
-        history: 对话历史列表
+        history: 对话历史(定长双端队列,超出上限时自动丢弃最早的消息),
+                 每条消息已是API所需的格式
+        _timestamps: 与history按下标对齐的消息时间戳(time.time_ns()纳秒整数,
+                     仅在保存会话时格式化为ISO字符串写出)
         max_history: 最大历史消息数
         session_dir: 会话保存目录
         session_file: 当前会话文件路径
+        _lock: 保护历史记录读写的可重入锁
+        _save_queue: 后台保存队列(首次后台保存时创建)
+        _loaded_session: 最近一次加载的会话名称
+        _older_messages: 已加载会话中位于history之前的消息(会话文件格式,含timestamp字段),
+                         包括加载时未保留的消息和加载后被挤出history的消息;
+                         以同一名称保存时写回文件开头,避免部分加载后保存丢失数据
+        _older_cursor: _older_messages中尚未通过load_older读取的消息数
     
     设计说明:
         采用单例模式确保全局会话状态一致,
         避免多个实例导致的对话历史不同步。
+        实例在多个线程间共享(Web服务、异步回调),
+        所有对history的修改和快照读取都在_lock保护下进行。
+        使用__slots__固定实例属性,新增属性时需同步加入__slots__。
     """
     
+    __slots__ = (
+        '_initialized',
+        'history',
+        '_timestamps',
+        'max_history',
+        'session_dir',
+        'session_file',
+        '_lock',
+        '_token_estimate',
+        '_turn_count',
+        '_topic_counts',
+        '_save_queue',
+        '_loaded_session',
+        '_older_messages',
+        '_older_cursor',
+    )
+    
     _instance: Optional['ConversationManager'] = None
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         """
         控制对象创建,实现单例模式
         
+        参数:
+            *args, **kwargs: 传给__init__的参数(实例已存在时由__init__调整max_history)
+        
         返回:
             ConversationManager: 全局唯一的实例
         """
@@ -74,7 +331,7 @@ class ConversationManager:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self, max_history: int = 50):
+    def __init__(self, max_history: Optional[int] = None):
         """
         初始化会话管理器
         
@@ -82,14 +339,29 @@ class ConversationManager:
             max_history: 最大历史消息数(默认50条)
         
         说明:
-            使用_initialized标志避免重复初始化
+            使用_initialized标志避免重复初始化;
+            实例已存在时,传入与当前不同的max_history会调整历史上限
         """
         if hasattr(self, '_initialized'):
+            if max_history is not None and max_history != self.max_history:
+                self.set_max_history(max_history)
             return
         
+        if max_history is None:
+            max_history = 50
+        
         self._initialized = True
-        self.history: List[Dict[str, str]] = []
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=max_history)
+        self._timestamps: Deque[Union[int, str, None]] = deque(maxlen=max_history)
         self.max_history = max_history
+        self._lock = threading.RLock()
+        self._token_estimate = 0
+        self._turn_count = 0
+        self._topic_counts: Counter = Counter()
+        self._save_queue: Optional[queue.Queue] = None
+        self._loaded_session: Optional[str] = None
+        self._older_messages: List[Dict[str, Any]] = []
+        self._older_cursor = 0
         
         self.session_dir = Path.home() / '.macmind' / 'sessions'
         self.session_dir.mkdir(parents=True, exist_ok=True)
@@ -114,23 +386,121 @@ class ConversationManager:
             manager.add_message("user", "帮我找一个绘图软件")
             manager.add_message("assistant", "我推荐drawio")
         """
-        if not content or not content.strip():
+        stripped = content.strip() if content else ""
+        if not stripped:
             logger.warning("尝试添加空消息,已忽略")
             return
         
         message = {
-            "role": role,
-            "content": content.strip(),
-            "timestamp": datetime.now().isoformat()
+            "role": sys.intern(role),
+            "content": stripped
         }
         
+        with self._lock:
+            self._append(message, time.time_ns())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"添加{role}消息,当前历史: {len(self.history)}条")
+    
+    def _append(self, message: Dict[str, Any], timestamp: int):
+        """
+        追加消息并维护统计信息(调用方需持有_lock)
+        
+        参数:
+            message: API格式的消息字典
+            timestamp: 消息时间戳(time.time_ns())
+        
+        说明:
+            history为定长deque,队满时append会在O(1)内丢弃最早的消息,
+            这里在追加前取出将被丢弃的消息,以便扣除其统计贡献;
+            已加载会话时被丢弃的消息转入_older_messages,保存时不会丢失。
+        """
+        if len(self.history) == self.history.maxlen:
+            removed = self.history[0]
+            self._account(removed, -1)
+            if self._loaded_session is not None:
+                self._older_messages.append(
+                    dict(removed, timestamp=_format_timestamp(self._timestamps[0]))
+                )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(f"历史消息达到上限,移除最早的消息: {removed['role']}")
+        
         self.history.append(message)
+        self._timestamps.append(timestamp)
+        self._account(message, 1)
+    
+    def _account(self, message: Dict[str, Any], sign: int):
+        """
+        增量更新单条消息对统计信息的贡献(调用方需持有_lock)
+        
+        参数:
+            message: 消息字典
+            sign: 1表示加入历史, -1表示移出历史
         
-        if len(self.history) > self.max_history:
-            removed = self.history.pop(0)
-            logger.debug(f"历史消息达到上限,移除最早的消息: {removed['role']}")
+        维护的统计:
+            - _token_estimate: token估算
+            - _turn_count: 对话轮次(用户消息数)
+            - _topic_counts: 每个话题被多少条用户消息提及
+        """
+        content = message.get("content")
+        self._token_estimate += sign * self._tokens_of(content)
         
-        logger.debug(f"添加{role}消息,当前历史: {len(self.history)}条")
+        if message["role"] == _ROLE_USER and content:
+            self._turn_count += sign
+            for topic in {_TOPIC_BY_WORD[m.group()] for m in _TOPIC_RE.finditer(content)}:
+                self._topic_counts[topic] += sign
+    
+    def set_max_history(self, max_history: int):
+        """
+        调整最大历史消息数
+        
+        参数:
+            max_history: 新的最大历史消息数
+        
+        说明:
+            按新上限重建history和_timestamps,缩小时保留最近的消息,
+            并重新计算统计信息
+        """
+        with self._lock:
+            dropped = len(self.history) - max_history
+            if dropped > 0 and self._loaded_session is not None:
+                self._older_messages.extend(
+                    dict(msg, timestamp=_format_timestamp(timestamp))
+                    for msg, timestamp in islice(zip(self.history, self._timestamps), dropped)
+                )
+            self.history = deque(self.history, maxlen=max_history)
+            self._timestamps = deque(self._timestamps, maxlen=max_history)
+            self.max_history = max_history
+            self._reset_stats()
+        logger.debug(f"最大历史消息数调整为: {max_history}")
+    
+    def _forget_loaded_session(self):
+        """
+        断开与已加载会话的关联(调用方需持有_lock)
+        
+        说明:
+            清空历史后开始的是新对话,保存时不再拼接原会话的较早消息
+        """
+        self._loaded_session = None
+        self._older_messages = []
+        self._older_cursor = 0
+    
+    def _reset_stats(self):
+        """
+        按当前history重新计算全部统计信息(调用方需持有_lock)
+        """
+        self._token_estimate = 0
+        self._turn_count = 0
+        self._topic_counts = Counter()
+        
+        for message in self.history:
+            self._account(message, 1)
+    
+    def _tail(self, count: int) -> List[Dict[str, Any]]:
+        """
+        返回最近count条消息组成的新列表(等价于列表切片[-count:],调用方需持有_lock)
+        """
+        start = max(0, len(self.history) - count) if count else 0
+        return list(islice(self.history, start, None))
     
     def add_user_message(self, content: str):
         """
@@ -142,7 +512,7 @@ class ConversationManager:
         示例:
             manager.add_user_message("帮我安装vim")
         """
-        self.add_message("user", content)
+        self.add_message(_ROLE_USER, content)
     
     def add_assistant_message(self, content: str):
         """
@@ -154,7 +524,7 @@ class ConversationManager:
         示例:
             manager.add_assistant_message("正在安装vim...")
         """
-        self.add_message("assistant", content)
+        self.add_message(_ROLE_ASSISTANT, content)
     
     def add_system_message(self, content: str):
         """
@@ -169,7 +539,7 @@ class ConversationManager:
         示例:
             manager.add_system_message("你是一个Mac系统助手")
         """
-        self.add_message("system", content)
+        self.add_message(_ROLE_SYSTEM, content)
     
     def get_context(self, max_messages: Optional[int] = None) -> List[Dict[str, Any]]:
         """
@@ -183,7 +553,8 @@ class ConversationManager:
         
         说明:
             - 返回格式符合OpenAI API要求
-            - 移除timestamp字段(仅内部使用)
+            - 时间戳单独存放,历史消息本身即为API格式,无需逐条重建字典
+            - 返回的消息字典与内部历史共享,调用方不应修改
             - 可限制消息数量以控制token使用
             - 支持工具调用消息(tool_calls和tool角色)
         
@@ -191,30 +562,10 @@ class ConversationManager:
             context = manager.get_context(max_messages=10)
             response = ai_client.chat(messages=context)
         """
-        messages = self.history if max_messages is None else self.history[-max_messages:]
-        
-        result = []
-        for msg in messages:
-            if msg["role"] == "tool":
-                result.append({
-                    "role": msg["role"],
-                    "tool_call_id": msg["tool_call_id"],
-                    "name": msg["name"],
-                    "content": msg["content"]
-                })
-            elif "tool_calls" in msg:
-                result.append({
-                    "role": msg["role"],
-                    "content": msg["content"],
-                    "tool_calls": msg["tool_calls"]
-                })
-            else:
-                result.append({
-                    "role": msg["role"],
-                    "content": msg["content"]
-                })
-        
-        return result
+        with self._lock:
+            if max_messages is None:
+                return list(self.history)
+            return self._tail(max_messages)
     
     def get_last_messages(self, count: int = 5) -> List[Dict[str, str]]:
         """
@@ -229,7 +580,42 @@ class ConversationManager:
         示例:
             last_msgs = manager.get_last_messages(3)
         """
-        return self.history[-count:] if self.history else []
+        with self._lock:
+            return self._tail(count)
+    
+    def get_last_user_message(self) -> Optional[str]:
+        """
+        获取最近一条用户消息的内容
+        
+        返回:
+            Optional[str]: 消息内容,没有用户消息时返回None
+        """
+        return self._last_content_of(_ROLE_USER)
+    
+    def get_last_assistant_message(self) -> Optional[str]:
+        """
+        获取最近一条AI响应的内容
+        
+        返回:
+            Optional[str]: 消息内容,没有AI响应时返回None
+        """
+        return self._last_content_of(_ROLE_ASSISTANT)
+    
+    def _last_content_of(self, role: str) -> Optional[str]:
+        """
+        从尾部反向查找指定角色的最近一条消息
+        
+        参数:
+            role: 消息角色
+        
+        返回:
+            Optional[str]: 消息内容,未找到时返回None
+        """
+        with self._lock:
+            for msg in reversed(self.history):
+                if msg["role"] == role:
+                    return msg["content"]
+        return None
     
     def clear_history(self):
         """
@@ -243,9 +629,19 @@ class ConversationManager:
         示例:
             manager.clear_history()
         """
-        self.history.clear()
+        with self._lock:
+            self.history.clear()
+            self._timestamps.clear()
+            self._reset_stats()
+            self._forget_loaded_session()
         logger.info("对话历史已清空")
     
+    def clear(self):
+        """
+        清空对话历史(clear_history的别名)
+        """
+        self.clear_history()
+    
     def get_message_count(self) -> int:
         """
         获取历史消息总数
@@ -266,12 +662,13 @@ class ConversationManager:
             int: 对话轮次(用户消息+AI响应=1轮)
         
         说明:
-            轮次=用户消息数(假设每个用户消息都有AI响应)
+            轮次=用户消息数(假设每个用户消息都有AI响应),
+            在增删消息时增量维护,调用本身为O(1)
         
         示例:
             turns = manager.get_conversation_turns()
         """
-        return sum(1 for msg in self.history if msg["role"] == "user")
+        return self._turn_count
     
     def estimate_tokens(self) -> int:
         """
@@ -283,72 +680,192 @@ class ConversationManager:
         说明:
             使用简单规则估算: 1个中文字符≈1.5token, 1个英文单词≈1.3token
             实际token数可能有偏差,仅供参考
+            结果在增删消息时增量维护,调用本身为O(1)
         
         示例:
             tokens = manager.estimate_tokens()
             if tokens > 4000:
                 manager.clear_history()
         """
-        total_tokens = 0
+        return self._token_estimate
+    
+    @staticmethod
+    def _tokens_of(content: Optional[str]) -> int:
+        """
+        估算单条消息内容的token数
         
-        for msg in self.history:
-            content = msg["content"]
-            
-            chinese_chars = sum(1 for c in content if '\u4e00' <= c <= '\u9fff')
-            english_words = len(content.split())
-            
-            total_tokens += int(chinese_chars * 1.5 + english_words * 1.3)
+        参数:
+            content: 消息内容(工具调用消息可能为None)
+        
+        返回:
+            int: 估算的token数
+        """
+        if not content:
+            return 0
         
-        return total_tokens
+        chinese_chars = sum(map(len, _CJK_RE.findall(content)))
+        english_words = len(content.split())
+        
+        return int(chinese_chars * 1.5 + english_words * 1.3)
     
-    def save_session(self, session_name: str = "default") -> bool:
+    def save_session(self, session_name: str = "default", background: bool = False) -> bool:
         """
         保存会话到文件
         
         参数:
             session_name: 会话名称(默认"default")
+            background: 是否交给后台线程写盘(默认False,同步写入)
         
         返回:
-            bool: 保存是否成功
+            bool: 保存是否成功(后台模式下表示已提交写入)
         
         文件格式:
-            JSON格式,包含历史消息和元数据
+            紧凑JSON格式,包含历史消息和元数据
+            (需要人工查看时使用save_session_pretty)
+        
+        说明:
+            后台模式下序列化仍在调用线程完成(保证快照一致),
+            磁盘I/O由写入线程执行,调用方无需等待;
+            需要确认落盘时调用commit_history()。
         
         示例:
             manager.save_session("my_session")
+            
+            # 每轮对话后保存,不阻塞交互
+            manager.save_session(background=True)
+        """
+        return self._save_session(session_name, pretty=False, background=background)
+    
+    def save_session_pretty(self, session_name: str = "default") -> bool:
+        """
+        以缩进格式保存会话到文件(便于人工阅读和调试)
+        
+        参数:
+            session_name: 会话名称(默认"default")
+        
+        返回:
+            bool: 保存是否成功
+        
+        示例:
+            manager.save_session_pretty("debug_session")
+        """
+        return self._save_session(session_name, pretty=True)
+    
+    def _save_session(self, session_name: str, pretty: bool, background: bool = False) -> bool:
+        """
+        保存会话的内部实现
+        
+        参数:
+            session_name: 会话名称
+            pretty: 是否缩进输出
+            background: 是否交给后台线程写盘
+        
+        返回:
+            bool: 保存是否成功
+        
+        说明:
+            以load_session加载时的名称保存时,文件中保留加载时未读入内存的较早消息,
+            load_older的读取位置保持有效
         """
         try:
             session_file = self.session_dir / f"{session_name}_session.json"
             
-            session_data = {
-                "name": session_name,
-                "created_at": datetime.now().isoformat(),
-                "message_count": len(self.history),
-                "conversation_turns": self.get_conversation_turns(),
-                "estimated_tokens": self.estimate_tokens(),
-                "history": self.history
-            }
+            with self._lock:
+                history = [
+                    dict(msg, timestamp=_format_timestamp(timestamp))
+                    for msg, timestamp in zip(self.history, self._timestamps)
+                ]
+                # 部分加载的会话以原名称保存时,把未加载/已挤出的较早消息写回开头
+                if session_name == self._loaded_session and self._older_messages:
+                    history[:0] = self._older_messages
+                session_data = {
+                    "name": session_name,
+                    "created_at": datetime.now().isoformat(),
+                    "message_count": len(history),
+                    "conversation_turns": self.get_conversation_turns(),
+                    "estimated_tokens": self.estimate_tokens(),
+                    "history": history
+                }
+            
+            payload = _dump_session(session_data, pretty=pretty)
             
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, indent=2, ensure_ascii=False)
+            if background:
+                self._enqueue_write(session_file, payload)
+                logger.debug(f"会话已提交后台保存: {session_file}")
+                return True
+            
+            _write_atomic(session_file, payload)
             
             logger.info(f"会话已保存: {session_file}")
             return True
             
         except Exception as e:
-            logger.error(f"保存会话失败: {e}", exc_info=True)
+            logger.exception("保存会话失败: %s", e)
             raise ConversationError(
                 "会话保存失败",
                 session_name=session_name,
                 cause=e
             )
     
-    def load_session(self, session_name: str = "default") -> bool:
+    def commit_history(self):
+        """
+        等待所有后台保存任务写盘完成
+        
+        说明:
+            程序退出时会自动调用;需要立即读取会话文件时也可手动调用。
+        
+        示例:
+            manager.save_session(background=True)
+            manager.commit_history()
+        """
+        if self._save_queue is not None:
+            self._save_queue.join()
+    
+    def _enqueue_write(self, session_file: Path, payload: bytes):
+        """
+        提交后台写盘任务,首次调用时启动写入线程
+        
+        参数:
+            session_file: 目标会话文件
+            payload: 已序列化的会话数据
+        """
+        with self._lock:
+            if self._save_queue is None:
+                self._save_queue = queue.Queue()
+                threading.Thread(
+                    target=self._writer_loop,
+                    name="ConversationWriter",
+                    daemon=True
+                ).start()
+                atexit.register(self.commit_history)
+        
+        self._save_queue.put((session_file, payload))
+    
+    def _writer_loop(self):
+        """
+        后台写入线程主循环
+        
+        说明:
+            写盘通过_write_atomic完成,与同步保存一样是崩溃安全的。
+            写入失败只能记录日志,无法再抛给调用方。
+        """
+        while True:
+            session_file, payload = self._save_queue.get()
+            try:
+                _write_atomic(session_file, payload)
+                logger.debug(f"后台保存会话完成: {session_file}")
+            except Exception as e:
+                logger.exception("后台保存会话失败: %s", e)
+            finally:
+                self._save_queue.task_done()
+    
+    def load_session(self, session_name: str = "default", tail: Optional[int] = None) -> bool:
         """
         从文件加载会话
         
         参数:
             session_name: 会话名称(默认"default")
+            tail: 只保留最近的N条消息(None=最多max_history条)
         
         返回:
             bool: 加载是否成功
@@ -356,22 +873,42 @@ class ConversationManager:
         说明:
             - 加载会话会覆盖当前历史记录
             - 如果文件不存在,返回False不抛出异常
+            - 未放入上下文的较早消息保留在已解析的列表中,
+              通过load_older()按页读取时不再重新解析文件;
+              以同一名称保存时这些消息会写回文件
         
         示例:
             if manager.load_session("my_session"):
                 print("会话加载成功")
+            
+            # 只恢复最近10条消息作为上下文
+            manager.load_session("my_session", tail=10)
         """
         try:
             session_file = self.session_dir / f"{session_name}_session.json"
             
-            if not session_file.exists():
+            try:
+                with open(session_file, 'rb') as f:
+                    session_data = _load_session(f.read())
+            except FileNotFoundError:
                 logger.warning(f"会话文件不存在: {session_file}")
                 return False
             
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
+            messages = session_data.get("history", [])
+            keep = self.max_history if tail is None else min(tail, self.max_history)
+            start = max(0, len(messages) - keep)
             
-            self.history = session_data.get("history", [])
+            with self._lock:
+                self.history = deque(maxlen=self.max_history)
+                self._timestamps = deque(maxlen=self.max_history)
+                for msg in islice(messages, start, None):
+                    msg["role"] = sys.intern(msg["role"])
+                    self._timestamps.append(msg.pop("timestamp", None))
+                    self.history.append(msg)
+                self._loaded_session = session_name
+                self._older_messages = messages[:start]
+                self._older_cursor = start
+                self._reset_stats()
             
             logger.info(
                 f"会话已加载: {session_name}, "
@@ -389,33 +926,89 @@ class ConversationManager:
                 cause=e
             )
         except Exception as e:
-            logger.error(f"加载会话失败: {e}", exc_info=True)
+            logger.exception("加载会话失败: %s", e)
             raise ConversationError(
                 "会话加载失败",
                 session_name=session_name,
                 cause=e
             )
     
-    def list_sessions(self) -> List[str]:
+    def load_older(self, count: int = 50) -> List[Dict[str, Any]]:
+        """
+        分页读取已加载会话中更早的消息
+        
+        参数:
+            count: 本次读取的消息数
+        
+        返回:
+            List[Dict]: 按时间顺序排列的较早消息,没有更多时返回空列表
+        
+        说明:
+            - 从上次load_session/load_older停止的位置继续向前读取
+            - 读取load_session时已解析的较早消息,不再重新读取和解析会话文件
+            - 返回的消息仅供展示,不会加入当前上下文(上下文长度受max_history限制)
+        
+        示例:
+            manager.load_session("my_session", tail=10)
+            older = manager.load_older(20)
+        """
+        with self._lock:
+            cursor = self._older_cursor
+            if cursor <= 0:
+                return []
+            start = max(0, cursor - count)
+            self._older_cursor = start
+            return [dict(msg) for msg in self._older_messages[start:cursor]]
+    
+    def list_sessions(self, limit: Optional[int] = None, by_mtime: bool = False) -> List[str]:
         """
         列出所有已保存的会话
         
+        参数:
+            limit: 最多返回的会话数(None=全部)
+            by_mtime: 是否按修改时间从新到旧排序(默认按名称排序)
+        
         返回:
             List[str]: 会话名称列表
         
+        说明:
+            使用os.scandir遍历目录,DirEntry的名称和类型信息无需额外stat,
+            也不为每个条目构造Path对象;
+            指定limit时使用堆选取前N个,复杂度为O(N log limit),
+            无需对全部会话排序。
+        
         示例:
             sessions = manager.list_sessions()
             for session in sessions:
                 print(f"会话: {session}")
+            
+            # 最近修改的20个会话
+            recent = manager.list_sessions(limit=20, by_mtime=True)
         """
-        session_files = self.session_dir.glob("*_session.json")
-        
-        sessions = [
-            f.stem.replace("_session", "")
-            for f in session_files
-        ]
+        with os.scandir(self.session_dir) as entries:
+            if by_mtime:
+                items = [
+                    (entry.stat().st_mtime, entry.name[:-_SESSION_SUFFIX_LEN])
+                    for entry in entries
+                    if entry.name.endswith(_SESSION_SUFFIX) and entry.is_file(follow_symlinks=False)
+                ]
+            else:
+                sessions = [
+                    entry.name[:-_SESSION_SUFFIX_LEN]
+                    for entry in entries
+                    if entry.name.endswith(_SESSION_SUFFIX) and entry.is_file(follow_symlinks=False)
+                ]
+        
+        if by_mtime:
+            if limit is None:
+                items.sort(reverse=True)
+            else:
+                items = heapq.nlargest(limit, items)
+            return [name for _, name in items]
         
-        return sorted(sessions)
+        if limit is None:
+            return sorted(sessions)
+        return heapq.nsmallest(limit, sessions)
     
     def delete_session(self, session_name: str) -> bool:
         """
@@ -433,16 +1026,17 @@ class ConversationManager:
         try:
             session_file = self.session_dir / f"{session_name}_session.json"
             
-            if not session_file.exists():
+            try:
+                session_file.unlink()
+            except FileNotFoundError:
                 logger.warning(f"会话文件不存在: {session_file}")
                 return False
             
-            session_file.unlink()
             logger.info(f"会话已删除: {session_name}")
             return True
             
         except Exception as e:
-            logger.error(f"删除会话失败: {e}", exc_info=True)
+            logger.exception("删除会话失败: %s", e)
             raise ConversationError(
                 "会话删除失败",
                 session_name=session_name,
@@ -459,6 +1053,9 @@ class ConversationManager:
         返回:
             Dict: 会话元数据,不存在返回None
         
+        说明:
+            只读取文件开头的元数据部分,耗时与历史消息数量无关
+        
         示例:
             info = manager.get_session_info("my_session")
             if info:
@@ -467,12 +1064,12 @@ class ConversationManager:
         try:
             session_file = self.session_dir / f"{session_name}_session.json"
             
-            if not session_file.exists():
+            try:
+                with open(session_file, 'rb') as f:
+                    session_data = _load_session_header(f)
+            except FileNotFoundError:
                 return None
             
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
-            
             return {
                 "name": session_data.get("name"),
                 "created_at": session_data.get("created_at"),
@@ -498,66 +1095,9 @@ class ConversationManager:
             - 详细的能力描述
             - 交互指导
             - 最佳实践建议
+            提示词为模块级常量,调用时直接返回,不再重复构建字符串
         """
-        prompt = """你是 MacMind 的 AI 助手,一个专业的 macOS 系统管理和软件管家。
-
-🔧 重要: 你拥有以下可执行的工具函数
-当用户需要执行实际操作时,你必须调用相应的工具函数,而不是仅仅描述如何操作:
-
-可用工具:
-1. search_software(query) - 搜索软件包
-2. install_software(package_name) - 安装软件
-3. list_installed_software() - 列出已安装软件
-4. open_app(app_name) - 打开应用程序
-5. quit_app(app_name) - 关闭应用程序
-6. check_app_status(app_name) - 查询应用状态
-7. get_system_info() - 获取系统信息
-
-使用工具的原则:
-- ✅ 当用户要求"搜索"、"安装"、"打开"等操作时,立即调用对应的工具函数
-- ✅ 先调用工具执行操作,再根据执行结果给出友好的回复
-- ✅ 如果操作成功,告知用户结果;如果失败,提供替代方案
-- ❌ 不要仅仅告诉用户"可以使用xx命令",而要实际执行操作
-- ❌ 不要问用户"需要我帮你安装吗",直接执行用户明确要求的操作
-
-你的能力范围:
-1. 📦 软件管理
-   - 搜索和推荐 macOS 软件 (使用 search_software)
-   - 安装软件包 (使用 install_software)
-   - 列出已安装软件 (使用 list_installed_software)
-   - 分析软件许可证,优先推荐开源软件
-
-2. 💻 系统控制
-   - 打开应用程序 (使用 open_app)
-   - 关闭应用程序 (使用 quit_app)
-   - 查询应用运行状态 (使用 check_app_status)
-   - 查询系统信息 (使用 get_system_info)
-
-3. ❓ 问题解答
-   - 解释 macOS 系统功能
-   - 提供故障排除建议
-   - 分享最佳实践
-
-交互原则:
-- 💬 用友好、简洁的语言回答
-- 🎯 精准理解用户意图,主动调用工具执行操作
-- 🛡️ 安全第一,在执行敏感操作前提醒用户
-- 💡 主动提供相关建议和替代方案
-- ✅ 确保推荐的软件具有清晰的许可证和合法性
-
-回答格式:
-- 使用适当的 emoji 提升可读性
-- 重要信息用粗体标记
-- 复杂步骤用编号列表
-- 执行工具后,总结操作结果
-
-特别提醒:
-- 当用户提到"绘图软件"、"视频编辑器"等,先调用 search_software 搜索,再推荐
-- 对于安装请求,直接调用 install_software,不要仅仅描述如何安装
-- 对于打开/关闭应用请求,直接调用 open_app/quit_app 执行操作
-
-现在,请以专业、友好的方式帮助用户,并主动使用工具执行实际操作。"""
-        return prompt.strip()
+        return _OPTIMIZED_SYSTEM_PROMPT
     
     def get_context_with_summary(self, max_messages: Optional[int] = None) -> List[Dict[str, str]]:
         """
@@ -572,56 +1112,32 @@ class ConversationManager:
         说明:
             当对话历史较长时,生成一个简要总结放在前面,
             帮助 AI 更好地理解上下文。
+            返回的消息不超过5条时不加总结;话题只统计返回窗口内的用户消息,
+            窗口覆盖完整历史时直接使用增量维护的_topic_counts,无需重新扫描。
         """
-        messages = self.get_context(max_messages)
-        
-        if len(messages) <= 5:
-            return messages
-        
-        turns = self.get_conversation_turns()
-        topics = self._extract_topics(messages)
-        
-        summary = f"""对话上下文总结:
+        with self._lock:
+            messages = self.get_context(max_messages)
+            
+            if len(messages) <= 5:
+                return messages
+            
+            turns = self._turn_count
+            if len(messages) == len(self.history):
+                topics = [topic for topic, count in self._topic_counts.items() if count > 0]
+            else:
+                topics = list({
+                    _TOPIC_BY_WORD[match.group()]
+                    for msg in messages
+                    if msg["role"] == _ROLE_USER and msg.get("content")
+                    for match in _TOPIC_RE.finditer(msg["content"])
+                })
+            
+            summary = f"""对话上下文总结:
 - 已进行 {turns} 轮对话
-- 主要话题: {', '.join(topics)}
+- 主要话题: {', '.join(topics or ["通用咨询"])}
 - 以下是最近的对话内容。"""
-        
-        context_with_summary = [
-            {"role": "system", "content": summary}
-        ] + (messages[-max_messages:] if max_messages else messages)
-        
-        return context_with_summary
-    
-    def _extract_topics(self, messages: List[Dict[str, str]]) -> List[str]:
-        """
-        从消息中提取主题关键词
-        
-        参数:
-            messages: 消息列表
-        
-        返回:
-            List[str]: 主题关键词列表
-        
-        说明:
-            使用简单的关键词匹配提取主题
-        """
-        topics = set()
-        keywords = {
-            "软件": ["搜索", "安装", "卸载", "软件", "应用"],
-            "系统控制": ["打开", "关闭", "启动", "退出"],
-            "通知管理": ["通知", "提醒", "消息"],
-            "快捷键": ["快捷键", "短按键", "键盘"],
-            "系统信息": ["版本", "信息", "状态"]
-        }
-        
-        for msg in messages:
-            if msg["role"] == "user":
-                content = msg["content"]
-                for topic, words in keywords.items():
-                    if any(word in content for word in words):
-                        topics.add(topic)
-        
-        return list(topics) if topics else ["通用咨询"]
+            
+            return [{"role": _ROLE_SYSTEM, "content": summary}, *messages]
     
     def add_context_message(self, message: str):
         """
@@ -662,13 +1178,14 @@ class ConversationManager:
             ])
         """
         message = {
-            "role": "assistant",
+            "role": _ROLE_ASSISTANT,
             "content": None,
-            "tool_calls": tool_calls,
-            "timestamp": datetime.now().isoformat()
+            "tool_calls": tool_calls
         }
-        self.history.append(message)
-        logger.debug(f"添加工具调用消息,调用数: {len(tool_calls)}")
+        with self._lock:
+            self._append(message, time.time_ns())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"添加工具调用消息,调用数: {len(tool_calls)}")
     
     def add_tool_result_message(self, tool_call_id: str, function_name: str, result: str):
         """
@@ -690,14 +1207,15 @@ class ConversationManager:
             )
         """
         message = {
-            "role": "tool",
+            "role": _ROLE_TOOL,
             "tool_call_id": tool_call_id,
             "name": function_name,
-            "content": result,
-            "timestamp": datetime.now().isoformat()
+            "content": result
         }
-        self.history.append(message)
-        logger.debug(f"添加工具结果消息: {function_name}")
+        with self._lock:
+            self._append(message, time.time_ns())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"添加工具结果消息: {function_name}")
     
     def __repr__(self) -> str:
         """返回会话管理器的字符串表示"""
@@ -9,9 +9,12 @@
 
 主要功能:
 1. 控制台输出 - INFO级别及以上
-2. 文件记录 - DEBUG级别及以上，按日期滚动
+2. 文件记录 - DEBUG级别及以上，按日期命名，超过5MB自动轮转(保留5个备份)
 3. 格式化输出 - 包含时间戳、级别、模块、行号
 4. 自动创建日志目录
+5. 异步输出 - 调用方只把日志记录放入队列，格式化和写盘在后台线程完成
+6. 可选syslog输出 - 设置环境变量 MACMIND_LOG_SINK=syslog 时，
+   文件记录改为经本地Unix socket发送给系统syslog
 
 使用示例:
     from infrastructure.logger import logger
@@ -22,13 +25,96 @@
     logger.error("错误信息", exc_info=True)
 """
 
+import atexit
 import logging
+import os
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, SysLogHandler
+from queue import Queue
 from pathlib import Path
-from datetime import datetime
 from typing import Optional
 
 
+# 日志目录和文件路径(模块加载时计算一次)
+# 日志存放在用户主目录的 .macmind/logs/ 下，按启动日期命名，格式: macmind_20241025.log
+_LOG_DIR = Path.home() / '.macmind' / 'logs'
+_LOG_FILE = _LOG_DIR / f"macmind_{time.strftime('%Y%m%d')}.log"
+
+# 日志格式(模块加载时构建一次,所有处理器共享)
+# 格式说明:
+# [2024-10-25 10:30:45] INFO     MacMind:42 - 这是一条日志
+# [时间戳] 级别(8字符宽) 模块名:行号 - 消息内容
+_FORMATTER = logging.Formatter(
+    '[%(asctime)s] %(levelname)-8s %(name)s:%(lineno)d - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# syslog输出的格式(时间戳和主机名由syslog守护进程添加)
+_SYSLOG_FORMATTER = logging.Formatter('macmind: %(levelname)s %(message)s')
+
+# 本地syslog的Unix socket地址(macOS为/var/run/syslog，Linux为/dev/log)
+_SYSLOG_ADDRESS = '/var/run/syslog' if sys.platform == 'darwin' else '/dev/log'
+
+
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """
+    带写缓冲的轮转文件处理器
+    
+    说明:
+        标准处理器每写一条记录都会flush一次，小日志行各自触发一次write系统调用。
+        这里使用64KB写缓冲，每条记录后的flush只在距上次刷盘超过flush_interval秒时生效，
+        另有后台线程定期刷盘，保证日志最多延迟flush_interval秒落盘。
+    """
+    
+    def __init__(self, filename, flush_interval: float = 2.0, buffer_size: int = 64 * 1024, **kwargs):
+        """
+        参数:
+            filename: 日志文件路径
+            flush_interval: 最长刷盘间隔(秒)
+            buffer_size: 写缓冲大小(字节)
+            **kwargs: 传给RotatingFileHandler的参数(maxBytes、backupCount、encoding等)
+        """
+        self._buffer_size = buffer_size
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        super().__init__(filename, **kwargs)
+        
+        self._flush_stopped = threading.Event()
+        threading.Thread(target=self._flush_loop, name="MacMindLogFlush", daemon=True).start()
+    
+    def _open(self):
+        """以大缓冲打开日志文件"""
+        return open(self.baseFilename, self.mode, buffering=self._buffer_size,
+                    encoding=self.encoding, errors=self.errors)
+    
+    def flush(self):
+        """每条记录后调用，仅在超过刷盘间隔时才真正写盘"""
+        if time.monotonic() - self._last_flush >= self._flush_interval:
+            self.force_flush()
+    
+    def force_flush(self):
+        """立即把缓冲中的日志写入磁盘"""
+        self.acquire()
+        try:
+            if self.stream and hasattr(self.stream, "flush"):
+                self.stream.flush()
+            self._last_flush = time.monotonic()
+        finally:
+            self.release()
+    
+    def close(self):
+        """关闭处理器前停止定时刷盘线程(关闭文件时会写出剩余缓冲)"""
+        self._flush_stopped.set()
+        super().close()
+    
+    def _flush_loop(self):
+        """后台定时刷盘"""
+        while not self._flush_stopped.wait(self._flush_interval):
+            self.force_flush()
+
+
 class Logger:
     """
     日志管理器 - 单例模式实现
@@ -37,6 +123,8 @@ class Logger:
         _instance: 类级别的单例实例
         _initialized: 标记是否已初始化
         logger: Python标准logging对象
+        _log_queue: 日志记录队列
+        _listener: 后台监听线程，负责把队列中的记录分发给控制台和文件处理器
     
     设计说明:
         使用__new__方法实现单例，确保无论创建多少次Logger对象，
@@ -45,6 +133,8 @@ class Logger:
     
     # 类变量：存储唯一实例
     _instance: Optional['Logger'] = None
+    # 类变量：是否已初始化(普通属性读取，比hasattr失败时走AttributeError路径更快)
+    _initialized: bool = False
     
     def __new__(cls):
         """
@@ -65,14 +155,15 @@ class Logger:
         初始化日志配置
         
         说明:
-            使用_initialized标志避免重复初始化，
+            使用类变量_initialized避免重复初始化，
             因为单例模式下__init__会被多次调用
         """
         # 检查是否已初始化，避免重复配置
-        if hasattr(self, '_initialized'):
+        cls = type(self)
+        if cls._initialized:
             return
         
-        self._initialized = True
+        cls._initialized = True
         self._setup_logger()
     
     def _setup_logger(self):
@@ -84,6 +175,7 @@ class Logger:
         2. 生成日志文件: macmind_YYYYMMDD.log
         3. 配置日志格式: [时间] 级别 模块:行号 - 消息
         4. 设置双输出: 控制台(INFO+) 和 文件(DEBUG+)
+        5. 通过QueueHandler/QueueListener把输出移到后台线程
         
         日志级别说明:
         - DEBUG: 详细的调试信息，仅记录到文件
@@ -91,27 +183,30 @@ class Logger:
         - WARNING: 警告信息
         - ERROR: 错误信息
         """
-        # 步骤1: 创建日志目录
-        # 日志存放在用户主目录的 .macmind/logs/ 下
-        log_dir = Path.home() / '.macmind' / 'logs'
-        log_dir.mkdir(parents=True, exist_ok=True)
+        # 步骤1: 创建日志目录(已存在时只需一次stat)
+        if not _LOG_DIR.is_dir():
+            _LOG_DIR.mkdir(parents=True, exist_ok=True)
         
-        # 步骤2: 生成日志文件名，按日期区分
-        # 格式: macmind_20241025.log
-        log_file = log_dir / f"macmind_{datetime.now().strftime('%Y%m%d')}.log"
+        # 步骤2: 日志文件名使用模块级的_LOG_FILE，按日期区分
+        log_file = _LOG_FILE
         
         # 步骤3: 获取Python标准logger实例
         self.logger = logging.getLogger('MacMind')
         self.logger.setLevel(logging.DEBUG)  # 设置最低级别为DEBUG
         
-        # 步骤4: 定义日志格式
-        # 格式说明:
-        # [2024-10-25 10:30:45] INFO     MacMind:42 - 这是一条日志
-        # [时间戳] 级别(8字符宽) 模块名:行号 - 消息内容
-        formatter = logging.Formatter(
-            '[%(asctime)s] %(levelname)-8s %(name)s:%(lineno)d - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        # 重复配置时先停止旧的监听线程并移除已有处理器,避免每条日志被重复格式化和写出
+        old_listener = getattr(self, '_listener', None)
+        if old_listener is not None:
+            atexit.unregister(old_listener.stop)
+            old_listener.stop()
+            for handler in old_listener.handlers:
+                handler.close()
+        self.logger.handlers.clear()
+        # 不再向root logger传播,避免其他地方配置的root处理器再输出一遍
+        self.logger.propagate = False
+        
+        # 步骤4: 日志格式使用模块级的_FORMATTER
+        formatter = _FORMATTER
         
         # 步骤5: 配置控制台输出处理器
         # 用途: 实时查看程序运行状态
@@ -123,20 +218,94 @@ class Logger:
         # 步骤6: 配置文件输出处理器
         # 用途: 完整记录所有日志，用于问题排查
         # 级别: DEBUG及以上（记录所有信息）
-        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        # 单个文件超过5MB时轮转，保留5个备份，限制磁盘占用；写入经64KB缓冲合并
+        file_handler = self._create_syslog_handler() if os.environ.get('MACMIND_LOG_SINK') == 'syslog' else None
+        if file_handler is None:
+            file_handler = _BufferedRotatingFileHandler(
+                log_file, maxBytes=5 * 1024 * 1024, backupCount=5, encoding='utf-8'
+            )
+            file_handler.setFormatter(formatter)
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
         
-        # 步骤7: 将处理器添加到logger
-        self.logger.addHandler(console_handler)
-        self.logger.addHandler(file_handler)
+        # 步骤7: logger只挂载QueueHandler，调用方仅需入队
+        # 真正的处理器由QueueListener在后台线程中调用，格式化和磁盘I/O不再阻塞调用方
+        self._log_queue: Queue = Queue(-1)
+        self.logger.addHandler(QueueHandler(self._log_queue))
+        
+        self._listener = QueueListener(
+            self._log_queue, console_handler, file_handler,
+            respect_handler_level=True
+        )
+        self._listener.start()
+        atexit.register(self._listener.stop)
+    
+    def _create_syslog_handler(self) -> Optional[logging.Handler]:
+        """
+        创建发送到本地syslog的处理器
+        
+        返回:
+            Optional[logging.Handler]: syslog处理器，socket不可用时返回None
+        
+        说明:
+            每条记录只需一次sendto系统调用，写盘和缓冲由syslog守护进程负责。
+            socket不可用时回退到文件输出。
+        """
+        # SysLogHandler在socket不存在时不会抛出异常，而是在每次输出时报错，需提前检查
+        if not os.path.exists(_SYSLOG_ADDRESS):
+            sys.stderr.write(f"syslog socket不存在({_SYSLOG_ADDRESS})，改用文件日志\n")
+            return None
+        
+        try:
+            handler = SysLogHandler(address=_SYSLOG_ADDRESS, facility=SysLogHandler.LOG_USER)
+        except OSError as e:
+            sys.stderr.write(f"无法连接syslog({_SYSLOG_ADDRESS})，改用文件日志: {e}\n")
+            return None
+        
+        handler.setFormatter(_SYSLOG_FORMATTER)
+        return handler
+    
+    def flush(self):
+        """
+        等待队列中的日志全部输出
+        
+        说明:
+            日志由后台线程异步写出，需要立即读取日志文件时(如测试)先调用本方法
+        
+        示例:
+            logger.info("完成")
+            logger.flush()
+        """
+        self._log_queue.join()
+        for handler in self._listener.handlers:
+            getattr(handler, 'force_flush', handler.flush)()
+    
+    def isEnabledFor(self, level: int) -> bool:
+        """
+        判断指定级别的日志是否会被处理
+        
+        参数:
+            level: 日志级别(如logging.DEBUG)
+        
+        返回:
+            bool: 是否启用
+        
+        使用场景:
+            - 热路径上构造调试信息的代价较高时,先判断再构造
+        
+        示例:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("执行AppleScript: %s...", script[:100])
+        """
+        return self.logger.isEnabledFor(level)
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args, **kwargs):
         """
         记录调试信息
         
         参数:
-            message: 调试消息内容
+            message: 调试消息内容(支持%s占位符)
+            *args: 占位符参数,仅在记录实际输出时才进行格式化
+            **kwargs: 透传给logging的关键字参数(如extra、stack_info)
         
         使用场景:
             - 变量值的跟踪
@@ -144,17 +313,19 @@ class Logger:
             - 详细的执行步骤
         
         示例:
-            logger.debug(f"搜索关键词: {keyword}")
-            logger.debug(f"找到{len(results)}个结果")
+            logger.debug("搜索关键词: %s", keyword)
+            logger.debug("找到%d个结果", len(results))
         """
-        self.logger.debug(message)
+        self.logger.debug(message, *args, **kwargs)
     
-    def info(self, message: str):
+    def info(self, message: str, *args, **kwargs):
         """
         记录一般信息
         
         参数:
-            message: 信息内容
+            message: 信息内容(支持%s占位符)
+            *args: 占位符参数
+            **kwargs: 透传给logging的关键字参数
         
         使用场景:
             - 程序正常运行状态
@@ -163,16 +334,18 @@ class Logger:
         
         示例:
             logger.info("开始搜索软件包")
-            logger.info(f"成功安装: {package_name}")
+            logger.info("成功安装: %s", package_name)
         """
-        self.logger.info(message)
+        self.logger.info(message, *args, **kwargs)
     
-    def warning(self, message: str):
+    def warning(self, message: str, *args, **kwargs):
         """
         记录警告信息
         
         参数:
-            message: 警告消息
+            message: 警告消息(支持%s占位符)
+            *args: 占位符参数
+            **kwargs: 透传给logging的关键字参数
         
         使用场景:
             - 潜在的问题
@@ -183,15 +356,17 @@ class Logger:
             logger.warning("API配置未找到，使用默认值")
             logger.warning("缓存已过期，将重新获取")
         """
-        self.logger.warning(message)
+        self.logger.warning(message, *args, **kwargs)
     
-    def error(self, message: str, exc_info: bool = False):
+    def error(self, message: str, *args, exc_info: bool = False, **kwargs):
         """
         记录错误信息
         
         参数:
-            message: 错误消息
+            message: 错误消息(支持%s占位符)
+            *args: 占位符参数
             exc_info: 是否包含异常堆栈信息（默认False）
+            **kwargs: 透传给logging的关键字参数
         
         使用场景:
             - 操作失败
@@ -202,7 +377,24 @@ class Logger:
             logger.error("安装失败")
             logger.error("API调用失败", exc_info=True)  # 包含完整堆栈
         """
-        self.logger.error(message, exc_info=exc_info)
+        self.logger.error(message, *args, exc_info=exc_info, **kwargs)
+    
+    def exception(self, message: str, *args, **kwargs):
+        """
+        记录错误信息并附带当前异常堆栈
+        
+        参数:
+            message: 错误消息(支持%s占位符)
+            *args: 占位符参数,仅在记录实际输出时才进行格式化
+            **kwargs: 透传给logging的关键字参数
+        
+        使用场景:
+            - 在except块中记录异常,等价于error(..., exc_info=True)
+        
+        示例:
+            logger.exception("保存会话失败: %s", e)
+        """
+        self.logger.exception(message, *args, **kwargs)
 
 
 # 模块级全局实例
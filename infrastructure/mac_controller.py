@@ -11,7 +11,8 @@ Mac系统控制模块 - Mac Controller
 5. 系统设置 - 打开系统偏好设置面板
 
 技术实现:
-- 使用osascript执行AppleScript命令
+- 使用常驻的osascript子进程执行AppleScript命令,避免每次调用都启动新进程
+- 常驻进程不可用时回退到一次性的osascript -e调用
 - 使用subprocess模块调用系统命令
 - 提供Python友好的API接口
 
@@ -38,12 +39,227 @@ Mac系统控制模块 - Mac Controller
     version = controller.get_macos_version()
 """
 
+import json
+import logging
 import subprocess
 import platform
-from typing import Optional, List, Dict
+import threading
+import time
+from typing import Optional, Iterator, List, Dict, FrozenSet, Sequence, Tuple
 from infrastructure.logger import logger
 from domain.exceptions import MacControlError
 
+try:
+    import psutil
+except ImportError:  # psutil为可选依赖,缺失时回退到AppleScript查询
+    psutil = None
+
+
+# 系统类型和macOS版本在进程生命周期内不变,模块加载时计算一次
+_SYSTEM_NAME = platform.system()
+_IS_MACOS = _SYSTEM_NAME == 'Darwin'
+_MACOS_VERSION = platform.mac_ver()[0] if _IS_MACOS else ''
+
+# 应用运行状态缓存的有效期(秒),避免短时间内重复查询同一应用
+_RUNNING_STATE_TTL = 2.0
+
+# 常驻osascript进程运行的JXA服务脚本
+# 协议: 每行一个JSON编码的[AppleScript源码, 参数列表],每行返回一个JSON结果
+#   {"ok": true, "output": "..."} 或 {"ok": false, "error": "..."}
+# 参数非空时通过run事件传给脚本的on run argv处理器,与osascript命令行传参一致
+# 列表结果按osascript的格式以", "连接,布尔结果输出为true/false
+# 编译后的脚本按源码缓存(最多_OSA_COMPILED_CACHE_SIZE个),重复执行同一脚本时跳过编译
+_OSA_COMPILED_CACHE_SIZE = 64
+# 常驻进程连续出现这么多次通信故障(中途退出、结果无法解析)后不再重启,改用一次性调用
+_OSA_MAX_FAILURES = 3
+_OSA_SERVER_JS = r"""
+ObjC.import('Foundation');
+var input = $.NSFileHandle.fileHandleWithStandardInput;
+var output = $.NSFileHandle.fileHandleWithStandardOutput;
+var TYPE_LIST = 0x6C697374, TYPE_BOOL = 0x626F6F6C, TYPE_TRUE = 0x74727565, TYPE_FALSE = 0x66616C73;
+var EVENT_CLASS_CORE = 0x61657674, EVENT_RUN = 0x6F617070, KEY_DIRECT_OBJECT = 0x2D2D2D2D;
+var CACHE_SIZE = %d;
+var compiled = Object.create(null), compiledCount = 0;
+function compile(source) {
+    var script = compiled[source];
+    if (script === undefined) {
+        if (compiledCount >= CACHE_SIZE) { compiled = Object.create(null); compiledCount = 0; }
+        script = $.NSAppleScript.alloc.initWithSource(source);
+        compiled[source] = script;
+        compiledCount++;
+    }
+    return script;
+}
+function execute(script, args, error) {
+    if (args.length === 0) { return script.executeAndReturnError(error); }
+    var argv = $.NSAppleEventDescriptor.listDescriptor;
+    for (var i = 0; i < args.length; i++) {
+        argv.insertDescriptorAtIndex($.NSAppleEventDescriptor.descriptorWithString(args[i]), i + 1);
+    }
+    var event = $.NSAppleEventDescriptor.appleEventWithEventClassEventIDTargetDescriptorReturnIDTransactionID(
+        EVENT_CLASS_CORE, EVENT_RUN, $.NSAppleEventDescriptor.currentProcessDescriptor, -1, 0);
+    event.setParamDescriptorForKeyword(argv, KEY_DIRECT_OBJECT);
+    return script.executeAppleEventError(event, error);
+}
+function text(desc) {
+    var type = desc.descriptorType;
+    if (type === TYPE_LIST) {
+        var items = [];
+        for (var i = 1; i <= desc.numberOfItems; i++) { items.push(text(desc.descriptorAtIndex(i))); }
+        return items.join(', ');
+    }
+    if (type === TYPE_BOOL || type === TYPE_TRUE || type === TYPE_FALSE) {
+        return desc.booleanValue ? 'true' : 'false';
+    }
+    return ObjC.unwrap(desc.stringValue) || '';
+}
+var buffer = '';
+while (true) {
+    var data = input.availableData;
+    if (data.length === 0) { break; }
+    buffer += ObjC.unwrap($.NSString.alloc.initWithDataEncoding(data, $.NSUTF8StringEncoding));
+    var index;
+    while ((index = buffer.indexOf('\n')) >= 0) {
+        var request = JSON.parse(buffer.slice(0, index));
+        buffer = buffer.slice(index + 1);
+        var error = $();
+        var result = execute(compile(request[0]), request[1], error);
+        var reply;
+        if (result.isNil()) {
+            var info = ObjC.deepUnwrap(error) || {};
+            reply = {ok: false, error: info.NSAppleScriptErrorMessage || 'AppleScript error'};
+        } else {
+            reply = {ok: true, output: text(result)};
+        }
+        output.writeData($(JSON.stringify(reply) + '\n').dataUsingEncoding($.NSUTF8StringEncoding));
+    }
+}
+""" % _OSA_COMPILED_CACHE_SIZE
+
+# 单应用操作的固定脚本,应用名作为argv传入,不拼接进脚本文本
+_OPEN_APP_SCRIPT = """
+on run argv
+    tell application (item 1 of argv) to activate
+end run
+"""
+
+# 检查后应用恰好自行退出时quit会报-600(应用未运行),同样视为成功
+_QUIT_APP_SCRIPT = """
+on run argv
+    set appName to item 1 of argv
+    tell application "System Events" to set isRunning to (name of processes) contains appName
+    if isRunning then
+        try
+            tell application appName to %s
+        on error errMsg number errNum
+            if errNum is -600 then return "not_running"
+            error errMsg number errNum
+        end try
+        return "quit"
+    end if
+    return "not_running"
+end run
+"""
+_QUIT_APP_SCRIPTS = {
+    False: _QUIT_APP_SCRIPT % "quit",
+    True: _QUIT_APP_SCRIPT % "quit without saving",
+}
+
+# 批量操作的固定脚本,每个argv参数是一个应用名,结果按参数顺序每行一个
+_QUIT_APPS_SCRIPT = """
+on run argv
+    set results to {}
+    tell application "System Events" to set runningNames to name of processes
+    repeat with appRef in argv
+        set appName to contents of appRef
+        if runningNames contains appName then
+            try
+                tell application appName to %s
+                set end of results to "true"
+            on error number errNum
+                -- -600: 应用已自行退出,视为成功
+                set end of results to (errNum is -600) as text
+            end try
+        else
+            set end of results to "true"
+        end if
+    end repeat
+    set AppleScript's text item delimiters to linefeed
+    return results as text
+end run
+"""
+_QUIT_APPS_SCRIPTS = {
+    False: _QUIT_APPS_SCRIPT % "quit",
+    True: _QUIT_APPS_SCRIPT % "quit without saving",
+}
+
+_IS_APP_RUNNING_SCRIPT = """
+on run argv
+    tell application "System Events" to return (name of every process) contains (item 1 of argv)
+end run
+"""
+
+_BUNDLE_ID_SCRIPT = """
+on run argv
+    return id of application (item 1 of argv)
+end run
+"""
+
+# 查询失败的应用输出"-"占位,避免空行在输出首尾被strip掉导致错位
+_BUNDLE_IDS_SCRIPT = """
+on run argv
+    set results to {}
+    repeat with appRef in argv
+        try
+            set end of results to id of application (contents of appRef)
+        on error
+            set end of results to "-"
+        end try
+    end repeat
+    set AppleScript's text item delimiters to linefeed
+    return results as text
+end run
+"""
+
+# 发送通知的固定脚本,argv按每4项一组: 内容、标题、副标题、是否播放提示音("1"/"0")
+_NOTIFICATION_SCRIPT = """
+on run argv
+    repeat with i from 1 to (count of argv) by 4
+        set {theMessage, theTitle, theSubtitle, withSound} to items i thru (i + 3) of argv
+        if withSound is "1" then
+            display notification theMessage with title theTitle subtitle theSubtitle sound name "default"
+        else
+            display notification theMessage with title theTitle subtitle theSubtitle
+        end if
+    end repeat
+end run
+"""
+
+
+def _notification_args(title: str, message: str, subtitle: Optional[str], sound: bool) -> List[str]:
+    """将一条通知转换为_NOTIFICATION_SCRIPT的4个参数"""
+    return [message, title, subtitle or "", "1" if sound else "0"]
+
+
+# AppleScript字符串字面量中需要转义的字符
+_APPLESCRIPT_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"'})
+
+# 常见系统快捷键,键已规范化(去空格、小写),查询时只需一次字典查找
+_COMMON_SHORTCUTS = {
+    "command+l": "锁定屏幕",
+    "command+space": "Spotlight搜索",
+    "command+tab": "应用切换",
+    "command+q": "退出应用",
+    "command+w": "关闭窗口",
+    "command+c": "复制",
+    "command+v": "粘贴",
+    "command+x": "剪切",
+    "command+z": "撤销",
+    "command+shift+3": "截屏(全屏)",
+    "command+shift+4": "截屏(区域)",
+    "command+shift+5": "截屏工具",
+}
+
 
 class MacController:
     """
@@ -51,6 +267,13 @@ class MacController:
     
     属性:
         is_macos: 标记是否运行在macOS系统
+        _osa: 常驻的osascript子进程(首次执行脚本时启动)
+        _osa_lock: 保护常驻进程的请求/响应配对
+        _osa_disabled: 常驻进程无法启动或连续故障过多时置True,之后直接走一次性调用
+        _osa_failures: 常驻进程连续通信故障次数,成功一次即清零
+        _bundle_cache: 应用名 -> Bundle ID 缓存
+        _running_cache: 应用名 -> (过期时间, 是否运行),有效期_RUNNING_STATE_TTL秒
+        _running_apps_cache: 最近一次get_running_apps的(过期时间, 应用名集合)
     
     设计说明:
         封装osascript和系统命令调用,提供统一的Python API。
@@ -63,12 +286,19 @@ class MacController:
         
         检查系统类型,如果不是macOS会记录警告。
         """
-        self.is_macos = platform.system() == 'Darwin'
+        self.is_macos = _IS_MACOS
+        self._osa: Optional[subprocess.Popen] = None
+        self._osa_lock = threading.Lock()
+        self._osa_disabled = False
+        self._osa_failures = 0
+        self._bundle_cache: Dict[str, str] = {}
+        self._running_cache: Dict[str, Tuple[float, bool]] = {}
+        self._running_apps_cache: Optional[Tuple[float, FrozenSet[str]]] = None
         
         if not self.is_macos:
             logger.warning(
-                f"当前系统不是macOS (系统: {platform.system()}), "
-                f"Mac控制功能将不可用"
+                "当前系统不是macOS (系统: %s), Mac控制功能将不可用",
+                _SYSTEM_NAME
             )
         else:
             logger.debug("MacController初始化完成")
@@ -83,7 +313,7 @@ class MacController:
         if not self.is_macos:
             raise MacControlError(
                 "Mac控制功能仅在macOS系统可用",
-                system=platform.system()
+                system=_SYSTEM_NAME
             )
     
     def _escape_applescript_string(self, text: str) -> str:
@@ -97,17 +327,20 @@ class MacController:
             str: 转义后的字符串
         
         说明:
-            防止AppleScript注入攻击
+            防止AppleScript注入攻击。
+            反斜杠和双引号在一次translate中同时转义,
+            不会把为双引号插入的反斜杠再次转义。
         """
-        return text.replace('"', '\\"').replace('\\', '\\\\')
+        return text.translate(_APPLESCRIPT_ESCAPES)
     
-    def _execute_applescript(self, script: str, timeout: int = 10) -> str:
+    def _execute_applescript(self, script: str, timeout: int = 10, args: Sequence[str] = ()) -> str:
         """
         执行AppleScript脚本
         
         参数:
             script: AppleScript脚本内容
             timeout: 超时时间(秒)
+            args: 传给脚本on run argv处理器的参数
         
         返回:
             str: 脚本执行输出
@@ -115,47 +348,274 @@ class MacController:
         抛出:
             MacControlError: 脚本执行失败
         
+        说明:
+            优先通过常驻osascript进程执行,省去每次启动进程和加载AppleScript
+            运行时的开销;常驻进程无法使用时回退到一次性的osascript -e调用。
+            可变内容(如应用名)通过args传入而不是拼进脚本,脚本文本保持不变,
+            常驻进程中只需编译一次,也无需转义。
+        
         示例:
             output = self._execute_applescript('tell application "Safari" to activate')
+            output = self._execute_applescript(_BUNDLE_ID_SCRIPT, args=("Safari",))
+        """
+        self._check_macos()
+        
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("执行AppleScript: %.100s...", script)
+        
+        output = self._execute_in_coprocess(script, timeout, args)
+        if output is not None:
+            return output
+        
+        return self._execute_oneshot(script, timeout, capture_output=True, args=args)
+    
+    def _execute_applescript_void(self, script: str, timeout: int = 10, args: Sequence[str] = ()):
+        """
+        执行不需要输出的AppleScript脚本
+        
+        参数:
+            script: AppleScript脚本内容
+            timeout: 超时时间(秒)
+            args: 传给脚本on run argv处理器的参数
+        
+        抛出:
+            MacControlError: 脚本执行失败
+        
+        说明:
+            用于打开应用、发送通知等只关心成功与否的操作。
+            回退到一次性osascript调用时stdout直接丢弃,只为错误信息保留stderr管道。
         """
         self._check_macos()
         
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("执行AppleScript: %.100s...", script)
+        
+        if self._execute_in_coprocess(script, timeout, args) is None:
+            self._execute_oneshot(script, timeout, capture_output=False, args=args)
+    
+    def _execute_applescript_batch(self, scripts: List[str], timeout: int = 10) -> List[Optional[str]]:
+        """
+        在一次AppleScript调用中依次执行多段脚本
+        
+        参数:
+            scripts: AppleScript脚本列表
+            timeout: 超时时间(秒)
+        
+        返回:
+            List[Optional[str]]: 与scripts一一对应的输出,单段脚本出错或无输出时为None
+        
+        抛出:
+            MacControlError: 整体脚本执行失败
+        
+        说明:
+            每段脚本包装为独立的script对象分别运行,单段出错不影响其余脚本,
+            多个相关查询只需一次往返。
+        
+        示例:
+            bundle_id, _ = self._execute_applescript_batch([
+                'id of application "Safari"',
+                'tell application "System Preferences" to activate'
+            ])
+        """
+        parts = []
+        for index, script in enumerate(scripts):
+            parts.append(f"script s{index}\n{script}\nend script")
+        for index in range(len(scripts)):
+            # 出错或无返回值时输出"-"占位,保证每段结果各占一行且不会在首尾被strip掉
+            parts.append(
+                f'set r{index} to "-"\n'
+                f'try\n'
+                f'set r{index} to (run s{index}) as text\n'
+                f'end try\n'
+                f'if r{index} is "" then set r{index} to "-"'
+            )
+        results = ", ".join(f"r{index}" for index in range(len(scripts)))
+        parts.append("set AppleScript's text item delimiters to linefeed")
+        parts.append(f"return {{{results}}} as text")
+        
+        lines = self._execute_applescript("\n".join(parts), timeout).splitlines()
+        return [
+            lines[index] if index < len(lines) and lines[index] != "-" else None
+            for index in range(len(scripts))
+        ]
+    
+    def _execute_oneshot(self, script: str, timeout: int, capture_output: bool,
+                         args: Sequence[str] = ()) -> str:
+        """
+        通过一次性的osascript -e调用执行AppleScript
+        
+        参数:
+            script: AppleScript脚本内容
+            timeout: 超时时间(秒)
+            capture_output: 是否读取stdout
+            args: 传给脚本on run argv处理器的参数
+        
+        返回:
+            str: 脚本输出(capture_output=False时为空字符串)
+        
+        抛出:
+            MacControlError: 脚本执行失败或超时
+        """
+        # 只包住subprocess调用本身,异常分支只会命中一个,脚本摘要在其中按需截取;
+        # 其余异常(如代码缺陷)直接向上抛出,不再被包装成MacControlError
         try:
-            logger.debug(f"执行AppleScript: {script[:100]}...")
-            
             result = subprocess.run(
-                ['osascript', '-e', script],
-                capture_output=True,
-                text=True,
+                ['osascript', '-e', script, *args],
+                stdout=subprocess.PIPE if capture_output else subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 timeout=timeout,
                 check=True
             )
-            
-            return result.stdout.strip()
-            
         except subprocess.CalledProcessError as e:
-            error_msg = e.stderr.strip() if e.stderr else str(e)
-            logger.error(f"AppleScript执行失败: {error_msg}")
+            error_msg = e.stderr.decode('utf-8', 'replace').strip() if e.stderr else str(e)
+            logger.error("AppleScript执行失败: %s", error_msg)
             raise MacControlError(
                 "AppleScript执行失败",
                 script=script[:100],
                 error=error_msg,
                 cause=e
-            )
-        except subprocess.TimeoutExpired:
-            logger.error(f"AppleScript执行超时")
+            ) from e
+        except subprocess.TimeoutExpired as e:
+            logger.error("AppleScript执行超时")
             raise MacControlError(
                 "AppleScript执行超时",
                 script=script[:100],
                 timeout=timeout
-            )
-        except Exception as e:
-            logger.error(f"AppleScript执行错误: {e}", exc_info=True)
+            ) from e
+        except OSError as e:
+            logger.error("AppleScript执行错误: %s", e)
             raise MacControlError(
                 "AppleScript执行错误",
                 script=script[:100],
                 cause=e
+            ) from e
+        
+        if not capture_output:
+            return ""
+        
+        # 以bytes读取,成功时只解码一次stdout,stderr仅在失败时解码
+        return result.stdout.decode('utf-8', 'replace').strip()
+    
+    def _execute_in_coprocess(self, script: str, timeout: int, args: Sequence[str] = ()) -> Optional[str]:
+        """
+        通过常驻osascript进程执行AppleScript
+        
+        参数:
+            script: AppleScript脚本内容
+            timeout: 超时时间(秒)
+            args: 传给脚本on run argv处理器的参数
+        
+        返回:
+            Optional[str]: 脚本输出;请求发出前常驻进程就不可用时返回None,由调用方回退
+        
+        抛出:
+            MacControlError: 脚本执行失败或超时;
+                请求已发出后常驻进程退出或返回无法解析的结果
+                (此时脚本可能已经执行,不能再回退重复执行)
+        
+        说明:
+            超时由定时器终止子进程实现,下次调用时会重新启动。
+            常驻进程退出后下次调用会重新启动;只有无法启动osascript,
+            或连续_OSA_MAX_FAILURES次通信故障时才永久改用一次性调用。
+        """
+        if self._osa_disabled:
+            return None
+        
+        with self._osa_lock:
+            if self._osa is None or self._osa.poll() is not None:
+                try:
+                    self._osa = subprocess.Popen(
+                        ['osascript', '-l', 'JavaScript', '-e', _OSA_SERVER_JS],
+                        stdin=subprocess.PIPE,
+                        stdout=subprocess.PIPE,
+                        stderr=subprocess.DEVNULL,
+                        text=True,
+                        encoding='utf-8',
+                        bufsize=1
+                    )
+                except OSError as e:
+                    logger.warning("无法启动常驻osascript进程,改用一次性调用: %s", e)
+                    self._osa_disabled = True
+                    return None
+            
+            osa = self._osa
+            timed_out = threading.Event()
+            
+            def _kill():
+                timed_out.set()
+                osa.kill()
+            
+            try:
+                # json.dumps默认转义非ASCII字符,服务端按块读取时不会截断多字节字符
+                osa.stdin.write(json.dumps([script, list(args)]) + '\n')
+                osa.stdin.flush()
+            except (OSError, ValueError):
+                # 请求没有送达,脚本未执行,本次安全地回退到一次性调用,下次调用重新启动常驻进程
+                osa.kill()
+                self._osa = None
+                self._record_osa_failure()
+                logger.warning("常驻osascript进程已退出,本次改用一次性调用")
+                return None
+            
+            timer = threading.Timer(timeout, _kill)
+            timer.start()
+            try:
+                line = osa.stdout.readline()
+            except (OSError, ValueError):
+                line = ''
+            finally:
+                timer.cancel()
+            
+            reply = None
+            if line:
+                try:
+                    reply = json.loads(line)
+                except ValueError:
+                    pass
+            
+            if not isinstance(reply, dict):
+                osa.kill()
+                self._osa = None
+                if timed_out.is_set():
+                    logger.error("AppleScript执行超时")
+                    raise MacControlError(
+                        "AppleScript执行超时",
+                        script=script[:100],
+                        timeout=timeout
+                    )
+                # 请求已发出,脚本可能已经执行,不回退重复执行;下次调用重新启动常驻进程
+                logger.error("常驻osascript进程执行中途退出或返回了无法解析的结果")
+                self._record_osa_failure()
+                raise MacControlError(
+                    "AppleScript执行错误",
+                    script=script[:100],
+                    error="常驻osascript进程未返回有效结果"
+                )
+            
+            self._osa_failures = 0
+        
+        if not reply.get("ok"):
+            error_msg = reply.get("error", "")
+            logger.error("AppleScript执行失败: %s", error_msg)
+            raise MacControlError(
+                "AppleScript执行失败",
+                script=script[:100],
+                error=error_msg
             )
+        
+        return reply.get("output", "").strip()
+    
+    def _record_osa_failure(self):
+        """
+        记录一次常驻进程通信故障(调用方需持有_osa_lock)
+        
+        说明:
+            连续故障达到_OSA_MAX_FAILURES次时停用常驻进程
+        """
+        self._osa_failures += 1
+        if self._osa_failures >= _OSA_MAX_FAILURES:
+            logger.warning("常驻osascript进程连续%d次故障,之后改用一次性调用", self._osa_failures)
+            self._osa_disabled = True
     
     def open_app(self, app_name: str) -> bool:
         """
@@ -175,15 +635,14 @@ class MacController:
             controller.open_app("Safari")
             controller.open_app("网易云音乐")
         """
-        app_name = self._escape_applescript_string(app_name)
-        script = f'tell application "{app_name}" to activate'
-        
+        self._running_cache.pop(app_name, None)
+        self._running_apps_cache = None
         try:
-            self._execute_applescript(script)
-            logger.info(f"已打开应用: {app_name}")
+            self._execute_applescript_void(_OPEN_APP_SCRIPT, args=(app_name,))
+            logger.info("已打开应用: %s", app_name)
             return True
         except MacControlError as e:
-            logger.error(f"打开应用失败: {app_name}")
+            logger.error("打开应用失败: %s", app_name)
             raise
     
     def quit_app(self, app_name: str, force: bool = False) -> bool:
@@ -200,32 +659,66 @@ class MacController:
         说明:
             - force=False: 正常退出,会提示保存
             - force=True: 强制退出,不保存未保存的内容
+            - 运行状态检查和退出在同一个AppleScript中完成,只需一次往返
+            - 应用未运行(包括检查后恰好退出)都视为关闭成功
         
         示例:
             controller.quit_app("Safari")
             controller.quit_app("TextEdit", force=True)
         """
+        self._running_cache.pop(app_name, None)
+        self._running_apps_cache = None
         try:
-            if not self.is_app_running(app_name):
-                logger.info(f"应用未运行,无需关闭: {app_name}")
-                return True
+            output = self._execute_applescript(_QUIT_APP_SCRIPTS[bool(force)], args=(app_name,))
         except MacControlError:
-            logger.warning(f"无法检查应用状态,尝试直接关闭: {app_name}")
-        
-        escaped_app_name = self._escape_applescript_string(app_name)
+            logger.error("关闭应用失败: %s", app_name)
+            raise
         
-        if force:
-            script = f'tell application "{escaped_app_name}" to quit without saving'
+        if output == "not_running":
+            logger.info("应用未运行,无需关闭: %s", app_name)
         else:
-            script = f'tell application "{escaped_app_name}" to quit'
+            logger.info("已关闭应用: %s", app_name)
+        return True
+    
+    def quit_apps(self, app_names: List[str], force: bool = False) -> Dict[str, bool]:
+        """
+        批量关闭应用程序
+        
+        参数:
+            app_names: 应用名称列表
+            force: 是否强制关闭(不保存)
+        
+        返回:
+            Dict[str, bool]: 应用名 -> 是否关闭成功(未运行的应用视为成功)
         
+        说明:
+            所有应用在同一个AppleScript中依次检查并退出,
+            无论关闭多少个应用都只执行一次脚本。
+        
+        示例:
+            results = controller.quit_apps(["Safari", "Notes"])
+            # 返回: {"Safari": True, "Notes": True}
+        """
+        if not app_names:
+            return {}
+        
+        for name in app_names:
+            self._running_cache.pop(name, None)
+        self._running_apps_cache = None
         try:
-            self._execute_applescript(script)
-            logger.info(f"已关闭应用: {app_name}")
-            return True
-        except MacControlError as e:
-            logger.error(f"关闭应用失败: {app_name}")
+            lines = self._execute_applescript(
+                _QUIT_APPS_SCRIPTS[bool(force)], args=app_names
+            ).splitlines()
+        except MacControlError:
+            logger.error("批量关闭应用失败: %s", ', '.join(app_names))
             raise
+        
+        results = {
+            name: index < len(lines) and lines[index].strip() == "true"
+            for index, name in enumerate(app_names)
+        }
+        logger.info("批量关闭应用完成: %d/%d", sum(results.values()), len(app_names))
+        return results
     
     def is_app_running(self, app_name: str) -> bool:
         """
@@ -238,29 +731,72 @@ class MacController:
             bool: 应用是否运行
         
         说明:
-            查询System Events获取运行中的应用列表
+            优先通过psutil逐个读取进程(约数毫秒),找到即停止;
+            psutil不可用时复用刚获取过的运行中应用列表,
+            没有可用列表时才查询System Events。
+            查询结果缓存_RUNNING_STATE_TTL秒,短时间内重复查询直接返回;
+            通过本控制器打开或关闭应用时会清除对应的缓存。
         
         示例:
             if controller.is_app_running("Safari"):
                 print("Safari正在运行")
         """
-        app_name = self._escape_applescript_string(app_name)
-        script = f'''
-        tell application "System Events"
-            set appList to name of every process
-            return appList contains "{app_name}"
-        end tell
-        '''
+        now = time.monotonic()
+        cached = self._running_cache.get(app_name)
+        if cached is not None and cached[0] > now:
+            return cached[1]
         
         try:
-            output = self._execute_applescript(script)
-            is_running = output.lower() == 'true'
-            logger.debug(f"应用运行状态 {app_name}: {is_running}")
+            is_running = None
+            if psutil is not None:
+                try:
+                    is_running = app_name in self.iter_running_apps()
+                except psutil.Error as e:
+                    logger.debug("psutil读取进程列表失败,改用AppleScript: %s", e)
+            if is_running is None:
+                listed = self._running_apps_cache
+                if listed is not None and listed[0] > now:
+                    is_running = app_name in listed[1]
+                else:
+                    output = self._execute_applescript(_IS_APP_RUNNING_SCRIPT, args=(app_name,))
+                    is_running = output.lower() == 'true'
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("应用运行状态 %s: %s", app_name, is_running)
+            self._running_cache[app_name] = (time.monotonic() + _RUNNING_STATE_TTL, is_running)
             return is_running
         except MacControlError:
-            logger.warning(f"无法查询应用状态: {app_name}")
+            logger.warning("无法查询应用状态: %s", app_name)
             return False
     
+    def iter_running_apps(self) -> Iterator[str]:
+        """
+        逐个产出运行中的应用/进程名
+        
+        返回:
+            Iterator[str]: 进程名迭代器
+        
+        抛出:
+            MacControlError: 如果不是macOS系统(首次取值时抛出)
+        
+        说明:
+            psutil可用时边读取进程表边产出,调用方找到目标后即可停止,
+            不必读完整个进程表(名称可能重复);
+            psutil不可用时产出get_running_apps()的结果。
+        
+        示例:
+            if "Safari" in controller.iter_running_apps():
+                print("Safari正在运行")
+        """
+        if psutil is None:
+            yield from self.get_running_apps()
+            return
+        
+        self._check_macos()
+        for proc in psutil.process_iter(['name']):
+            name = proc.info['name']
+            if name:
+                yield name
+    
     def get_running_apps(self) -> List[str]:
         """
         获取所有运行中的应用程序列表
@@ -268,22 +804,35 @@ class MacController:
         返回:
             List[str]: 运行中的应用名称列表
         
+        说明:
+            优先通过psutil读取进程表,结果包含后台进程,同名进程只保留一个;
+            psutil不可用时查询System Events,脚本以换行分隔输出进程名,
+            直接splitlines即可,不会被名称中包含逗号的进程拆错。
+            结果缓存_RUNNING_STATE_TTL秒,供紧随其后的is_app_running复用。
+        
         示例:
             apps = controller.get_running_apps()
             for app in apps:
                 print(f"运行中: {app}")
         """
         script = '''
-        tell application "System Events"
-            set appList to name of every process
-            return appList
-        end tell
+        tell application "System Events" to set appList to name of every process
+        set AppleScript's text item delimiters to linefeed
+        return appList as text
         '''
         
         try:
-            output = self._execute_applescript(script)
-            apps = [app.strip() for app in output.split(',') if app.strip()]
-            logger.debug(f"获取到{len(apps)}个运行中的应用")
+            apps = None
+            if psutil is not None:
+                try:
+                    apps = list(dict.fromkeys(self.iter_running_apps()))
+                except psutil.Error as e:
+                    logger.debug("psutil读取进程列表失败,改用AppleScript: %s", e)
+            if apps is None:
+                apps = self._execute_applescript(script).splitlines()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("获取到%d个运行中的应用", len(apps))
+            self._running_apps_cache = (time.monotonic() + _RUNNING_STATE_TTL, frozenset(apps))
             return apps
         except MacControlError:
             logger.error("获取运行中应用列表失败")
@@ -300,23 +849,88 @@ class MacController:
             str: Bundle ID (如"com.apple.Safari"), 失败返回None
         
         说明:
-            Bundle ID用于系统级别的应用标识
+            Bundle ID用于系统级别的应用标识。
+            查询成功的结果会被缓存(Bundle ID只会随重装应用改变),
+            查询失败不缓存,以便应用安装后能重新获取。
         
         示例:
             bundle_id = controller.get_app_bundle_id("Safari")
             # 返回: "com.apple.Safari"
         """
-        app_name = self._escape_applescript_string(app_name)
-        script = f'id of application "{app_name}"'
+        cached = self._bundle_cache.get(app_name)
+        if cached is not None:
+            return cached
         
         try:
-            output = self._execute_applescript(script)
-            logger.debug(f"应用Bundle ID: {app_name} -> {output}")
-            return output if output else None
+            output = self._execute_applescript(_BUNDLE_ID_SCRIPT, args=(app_name,))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("应用Bundle ID: %s -> %s", app_name, output)
+            if not output:
+                return None
+            self._bundle_cache[app_name] = output
+            return output
         except MacControlError:
-            logger.warning(f"无法获取Bundle ID: {app_name}")
+            logger.warning("无法获取Bundle ID: %s", app_name)
             return None
     
+    def get_app_bundle_ids(self, app_names: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量获取应用的Bundle ID
+        
+        参数:
+            app_names: 应用名称列表
+        
+        返回:
+            Dict[str, Optional[str]]: 应用名 -> Bundle ID(获取失败为None)
+        
+        说明:
+            已缓存的结果直接返回,其余应用在同一个AppleScript中查询,
+            无论查询多少个应用都只执行一次脚本。
+        
+        示例:
+            ids = controller.get_app_bundle_ids(["Safari", "Notes"])
+            # 返回: {"Safari": "com.apple.Safari", "Notes": "com.apple.Notes"}
+        """
+        results: Dict[str, Optional[str]] = {
+            name: self._bundle_cache.get(name) for name in app_names
+        }
+        missing = [name for name, bundle_id in results.items() if bundle_id is None]
+        if not missing:
+            return results
+        
+        try:
+            lines = self._execute_applescript(_BUNDLE_IDS_SCRIPT, args=missing).splitlines()
+        except MacControlError:
+            logger.warning("无法批量获取Bundle ID: %s", ', '.join(missing))
+            return results
+        
+        for index, name in enumerate(missing):
+            bundle_id = lines[index].strip() if index < len(lines) else "-"
+            if bundle_id != "-":
+                self._bundle_cache[name] = bundle_id
+                results[name] = bundle_id
+        return results
+    
+    def are_apps_running(self, app_names: List[str]) -> Dict[str, bool]:
+        """
+        批量检查应用是否正在运行
+        
+        参数:
+            app_names: 应用名称列表
+        
+        返回:
+            Dict[str, bool]: 应用名 -> 是否运行
+        
+        说明:
+            只查询一次运行中的进程列表,再逐个判断,
+            查询失败时所有应用都视为未运行(与is_app_running一致)。
+        
+        示例:
+            status = controller.are_apps_running(["Safari", "Notes"])
+        """
+        running = set(self.get_running_apps())
+        return {name: name in running for name in app_names}
+    
     def get_macos_version(self) -> str:
         """
         获取macOS版本
@@ -324,19 +938,16 @@ class MacController:
         返回:
             str: macOS版本字符串(如"14.0")
         
+        说明:
+            版本在模块加载时读取一次(模块级常量_MACOS_VERSION)
+        
         示例:
             version = controller.get_macos_version()
             print(f"macOS版本: {version}")
         """
         self._check_macos()
         
-        try:
-            version = platform.mac_ver()[0]
-            logger.debug(f"macOS版本: {version}")
-            return version
-        except Exception as e:
-            logger.error(f"获取macOS版本失败: {e}")
-            return "unknown"
+        return _MACOS_VERSION or "unknown"
     
     def open_system_preferences(self, pane: Optional[str] = None) -> bool:
         """
@@ -366,11 +977,11 @@ class MacController:
             script = 'tell application "System Preferences" to activate'
         
         try:
-            self._execute_applescript(script)
-            logger.info(f"已打开系统偏好设置: {pane or '主界面'}")
+            self._execute_applescript_void(script)
+            logger.info("已打开系统偏好设置: %s", pane or '主界面')
             return True
         except MacControlError:
-            logger.error(f"打开系统偏好设置失败: {pane}")
+            logger.error("打开系统偏好设置失败: %s", pane)
             return False
     
     def guide_notification_settings(self, app_name: str) -> str:
@@ -404,7 +1015,7 @@ class MacController:
 提示: 您也可以点击下方链接直接打开通知设置面板
 """
         
-        logger.info(f"引导用户设置通知权限: {app_name}")
+        logger.info("引导用户设置通知权限: %s", app_name)
         
         try:
             self.open_system_preferences("com.apple.preference.notifications")
@@ -466,6 +1077,9 @@ class MacController:
         返回:
             bool: 发送是否成功
         
+        说明:
+            通知内容作为参数传给固定脚本,无需转义,脚本只编译一次。
+        
         示例:
             controller.send_notification(
                 "MacMind", 
@@ -473,26 +1087,59 @@ class MacController:
                 subtitle="drawio已成功安装"
             )
         """
-        title = self._escape_applescript_string(title)
-        message = self._escape_applescript_string(message)
+        try:
+            self._execute_applescript_void(
+                _NOTIFICATION_SCRIPT,
+                args=_notification_args(title, message, subtitle, sound)
+            )
+            logger.info("已发送通知: %s", title)
+            return True
+        except MacControlError:
+            logger.error("发送通知失败: %s", title)
+            return False
+    
+    def send_notifications(self, notifications: List[Dict]) -> bool:
+        """
+        批量发送系统通知
         
-        script_parts = [f'display notification "{message}" with title "{title}"']
+        参数:
+            notifications: 通知列表,每项为包含以下键的字典
+                - title: 通知标题
+                - message: 通知内容
+                - subtitle: 副标题(可选)
+                - sound: 是否播放提示音(可选,默认True)
         
-        if subtitle:
-            subtitle = self._escape_applescript_string(subtitle)
-            script_parts[0] = f'display notification "{message}" with title "{title}" subtitle "{subtitle}"'
+        返回:
+            bool: 发送是否成功
         
-        if sound:
-            script_parts[0] += ' sound name "default"'
+        说明:
+            所有通知在同一次脚本执行中依次发出,
+            无论多少条通知都只有一次往返。
+        
+        示例:
+            controller.send_notifications([
+                {"title": "MacMind", "message": "drawio已安装"},
+                {"title": "MacMind", "message": "vim已安装", "sound": False},
+            ])
+        """
+        if not notifications:
+            return True
         
-        script = script_parts[0]
+        args = []
+        for notification in notifications:
+            args.extend(_notification_args(
+                notification['title'],
+                notification['message'],
+                notification.get('subtitle'),
+                notification.get('sound', True)
+            ))
         
         try:
-            self._execute_applescript(script)
-            logger.info(f"已发送通知: {title}")
+            self._execute_applescript_void(_NOTIFICATION_SCRIPT, args=args)
+            logger.info("已发送%d条通知", len(notifications))
             return True
         except MacControlError:
-            logger.error(f"发送通知失败: {title}")
+            logger.error("批量发送通知失败: %d条", len(notifications))
             return False
     
     def get_notification_settings(self, app_name: str) -> Optional[Dict]:
@@ -514,7 +1161,7 @@ class MacController:
         bundle_id = self.get_app_bundle_id(app_name)
         
         if not bundle_id:
-            logger.warning(f"无法获取Bundle ID: {app_name}")
+            logger.warning("无法获取Bundle ID: %s", app_name)
             return None
         
         return {
@@ -524,6 +1171,41 @@ class MacController:
             "note": "由于macOS安全限制,需要手动查看和修改通知设置"
         }
     
+    def _open_notification_settings(self, app_name: str) -> Optional[str]:
+        """
+        获取应用Bundle ID并打开通知设置面板
+        
+        参数:
+            app_name: 应用名称
+        
+        返回:
+            Optional[str]: Bundle ID,获取失败返回None
+        
+        说明:
+            Bundle ID未缓存时,查询和打开面板合并为一次AppleScript调用;
+            面板打开失败只记录日志,不影响引导文本的生成。
+        """
+        pane_script = 'tell application "System Preferences" to reveal pane "com.apple.preference.notifications"'
+        
+        bundle_id = self._bundle_cache.get(app_name)
+        if bundle_id is not None:
+            self.open_system_preferences("com.apple.preference.notifications")
+            return bundle_id
+        
+        escaped_app_name = self._escape_applescript_string(app_name)
+        try:
+            bundle_id, _ = self._execute_applescript_batch([
+                f'return id of application "{escaped_app_name}"',
+                f'{pane_script}\nreturn "ok"'
+            ])
+        except MacControlError:
+            logger.warning("无法获取Bundle ID并打开通知设置: %s", app_name)
+            return None
+        
+        if bundle_id:
+            self._bundle_cache[app_name] = bundle_id
+        return bundle_id
+    
     def disable_app_notifications(self, app_name: str) -> str:
         """
         引导用户禁用应用通知
@@ -542,7 +1224,7 @@ class MacController:
             guide = controller.disable_app_notifications("网易云音乐")
             print(guide)
         """
-        bundle_id = self.get_app_bundle_id(app_name)
+        bundle_id = self._open_notification_settings(app_name)
         bundle_info = f"\nBundle ID: {bundle_id}" if bundle_id else ""
         
         guide_text = f"""
@@ -558,12 +1240,7 @@ class MacController:
 提示: 系统设置面板将自动打开
 """
         
-        logger.info(f"引导用户禁用通知: {app_name}")
-        
-        try:
-            self.open_system_preferences("com.apple.preference.notifications")
-        except Exception:
-            pass
+        logger.info("引导用户禁用通知: %s", app_name)
         
         return guide_text.strip()
     
@@ -585,7 +1262,7 @@ class MacController:
             guide = controller.enable_app_notifications("Safari")
             print(guide)
         """
-        bundle_id = self.get_app_bundle_id(app_name)
+        bundle_id = self._open_notification_settings(app_name)
         bundle_info = f"\nBundle ID: {bundle_id}" if bundle_id else ""
         
         guide_text = f"""
@@ -602,12 +1279,7 @@ class MacController:
 提示: 系统设置面板将自动打开
 """
         
-        logger.info(f"引导用户启用通知: {app_name}")
-        
-        try:
-            self.open_system_preferences("com.apple.preference.notifications")
-        except Exception:
-            pass
+        logger.info("引导用户启用通知: %s", app_name)
         
         return guide_text.strip()
     
@@ -705,7 +1377,7 @@ class MacController:
         guide_text += "\n4. 保存并重新加载 Hammerspoon 配置\n"
         guide_text += "\n💡 提示: Hammerspoon 方案更灵活,支持复杂操作和条件判断"
         
-        logger.info(f"生成快捷键引导: {shortcut}")
+        logger.info("生成快捷键引导: %s", shortcut)
         return guide_text.strip()
     
     def install_hammerspoon(self) -> bool:
@@ -720,15 +1392,15 @@ class MacController:
             可用于创建快捷键、窗口管理等
         """
         try:
-            import subprocess
-            
             print("🔧 准备安装 Hammerspoon...")
             print("Hammerspoon 是一个强大的 macOS 自动化工具")
             print()
             
+            # 只检查stdout中的安装状态,不需要stderr
             result = subprocess.run(
                 ['brew', 'info', 'hammerspoon'],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True
             )
             
@@ -755,7 +1427,7 @@ class MacController:
                 return True
                 
         except Exception as e:
-            logger.error(f"安装 Hammerspoon 失败: {e}")
+            logger.error("安装 Hammerspoon 失败: %s", e)
             print(f"❌ 安装过程出错: {e}")
             return False
     
@@ -770,30 +1442,15 @@ class MacController:
             Dict: 冲突检查结果
         
         说明:
-            提供常见系统快捷键的冲突检查
-        """
-        common_shortcuts = {
-            "Command+L": "锁定屏幕",
-            "Command+Space": "Spotlight搜索",
-            "Command+Tab": "应用切换",
-            "Command+Q": "退出应用",
-            "Command+W": "关闭窗口",
-            "Command+C": "复制",
-            "Command+V": "粘贴",
-            "Command+X": "剪切",
-            "Command+Z": "撤销",
-            "Command+Shift+3": "截屏(全屏)",
-            "Command+Shift+4": "截屏(区域)",
-            "Command+Shift+5": "截屏工具",
-        }
-        
-        normalized_shortcut = shortcut.replace(" ", "")
+            提供常见系统快捷键的冲突检查,忽略空格和大小写
+        """
+        conflicts_with = _COMMON_SHORTCUTS.get(shortcut.replace(" ", "").lower())
         
-        if normalized_shortcut in common_shortcuts:
+        if conflicts_with is not None:
             return {
                 "has_conflict": True,
                 "shortcut": shortcut,
-                "conflicts_with": common_shortcuts[normalized_shortcut],
+                "conflicts_with": conflicts_with,
                 "suggestion": f"建议使用 {shortcut}+Shift 或其他组合"
             }
         else:
@@ -805,4 +1462,4 @@ class MacController:
     
     def __repr__(self) -> str:
         """返回控制器的字符串表示"""
-        return f"MacController(macos={self.is_macos}, version={self.get_macos_version() if self.is_macos else 'N/A'})"
+        return f"MacController(macos={self.is_macos}, version={_MACOS_VERSION if self.is_macos else 'N/A'})"
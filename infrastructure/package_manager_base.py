@@ -29,8 +29,16 @@ class PackageManagerBase(ABC):
     - uninstall: 卸载软件包
     - list_installed: 列出已安装的包
     - is_available: 检查包管理器是否可用
+    
+    可选覆盖的批量方法:
+    - install_batch: 一次调用安装多个包(默认逐个安装)
+    - info_batch: 一次调用获取多个包的信息(默认逐个获取),
+      覆盖为单次调用时同时把supports_info_batch设为True
     """
     
+    # info_batch是否由一次包管理器调用完成;为False时调用方宜自行并发调用info
+    supports_info_batch: bool = False
+    
     @abstractmethod
     def get_type(self) -> PackageManagerType:
         """返回包管理器类型"""
@@ -66,6 +74,20 @@ class PackageManagerBase(ABC):
         """列出已安装的软件包"""
         pass
     
+    def install_batch(self, packages: List[str], options: Optional[Dict[str, Any]] = None) -> Dict[str, bool]:
+        """批量安装软件包,返回{包名: 是否成功}。默认逐个安装,子类可覆盖为单次调用"""
+        return {package: self.install(package, options) for package in packages}
+    
+    def info_batch(self, packages: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量获取软件包信息,返回{包名: 信息或None}。默认逐个获取,获取失败的包为None"""
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        for package in packages:
+            try:
+                results[package] = self.info(package)
+            except Exception:
+                results[package] = None
+        return results
+    
     def get_name(self) -> str:
         """返回包管理器名称"""
         return self.get_type().value
@@ -5,13 +5,20 @@
 支持并发执行以提升性能。
 """
 
+import atexit
+import os
 import platform
-from typing import Optional, List, Dict, Any
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from typing import Optional, List, Dict, Any, Callable
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from infrastructure.logger import logger
 from infrastructure.package_manager_base import PackageManagerBase, PackageManagerType
 
 
+# 搜索/查询是等待子进程的IO型任务,并发数不受CPU核数限制,按核数的两倍(至少8个)设置
+_IO_WORKERS = max(8, 2 * (os.cpu_count() or 1))
+
+
 class PackageManagerFactory:
     """
     包管理器工厂类
@@ -19,11 +26,15 @@ class PackageManagerFactory:
     功能:
     1. 自动检测系统可用的包管理器
     2. 提供统一的包管理接口
-    3. 支持并发执行多个任务
+    3. 支持并发执行多个任务(共享一个常驻线程池)
     """
     
     _instance: Optional['PackageManagerFactory'] = None
+    # 类变量：是否已初始化,单例模式下__init__会被多次调用
+    _initialized: bool = False
     _manager: Optional[PackageManagerBase] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_lock = threading.Lock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -31,8 +42,14 @@ class PackageManagerFactory:
         return cls._instance
     
     def __init__(self):
-        if self._manager is None:
-            self._manager = self._detect_package_manager()
+        cls = type(self)
+        if cls._initialized:
+            return
+        
+        # 检测成功后才标记为已初始化,检测抛出异常时下次构造会重新检测,
+        # 不会留下_manager为None的单例
+        self._manager = self._detect_package_manager()
+        cls._initialized = True
     
     def _detect_package_manager(self) -> Optional[PackageManagerBase]:
         """
@@ -44,6 +61,10 @@ class PackageManagerFactory:
         3. RHEL/CentOS/Fedora: yum/dnf
         4. Arch: pacman
         5. Snap (通用)
+        
+        说明:
+            各包管理器的is_available只检查可执行文件,不启动子进程;
+            macOS上只检查brew,不再探测apt。
         """
         system = platform.system().lower()
         logger.info(f"检测操作系统: {system}")
@@ -51,7 +72,10 @@ class PackageManagerFactory:
         from infrastructure.brew_executor import BrewExecutor
         from infrastructure.apt_executor import AptExecutor
         
-        managers = [BrewExecutor(), AptExecutor()]
+        if system == 'darwin':
+            managers = [BrewExecutor()]
+        else:
+            managers = [BrewExecutor(), AptExecutor()]
         
         for manager in managers:
             try:
@@ -66,108 +90,172 @@ class PackageManagerFactory:
         return BrewExecutor()
     
     def get_manager(self) -> PackageManagerBase:
-        """获取当前系统的包管理器"""
-        if self._manager is None:
-            self._manager = self._detect_package_manager()
+        """获取当前系统的包管理器(检测在首次构造时完成,总能返回一个管理器)"""
         return self._manager
     
-    def search_concurrent(self, keywords: List[str], max_workers: int = 5) -> Dict[str, List[str]]:
+    def search_concurrent(self, keywords: List[str], max_workers: Optional[int] = None) -> Dict[str, List[str]]:
         """
         并发搜索多个关键词
         
         参数:
             keywords: 搜索关键词列表
-            max_workers: 最大并发数
+            max_workers: 最大并发数,默认按关键词数量和CPU数自动确定
         
         返回:
-            Dict[str, List[str]]: {keyword: [package_names]}
+            Dict[str, List[str]]: {keyword: [package_names]},按keywords的顺序排列
         """
-        manager = self.get_manager()
-        results = {}
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_keyword = {
-                executor.submit(manager.search, keyword): keyword 
-                for keyword in keywords
-            }
-            
-            for future in as_completed(future_to_keyword):
-                keyword = future_to_keyword[future]
-                try:
-                    results[keyword] = future.result()
-                except Exception as e:
-                    logger.error(f"并发搜索失败 ({keyword}): {e}")
-                    results[keyword] = []
-        
-        return results
+        return self._run_concurrent(
+            self.get_manager().search, keywords, max_workers,
+            default=[], error_message="并发搜索失败"
+        )
     
     def install_concurrent(
         self, 
         packages: List[str], 
-        max_workers: int = 3,
+        max_workers: Optional[int] = None,
         options: Optional[Dict[str, Any]] = None
     ) -> Dict[str, bool]:
         """
-        并发安装多个软件包
+        批量安装多个软件包
         
         参数:
             packages: 软件包名称列表
-            max_workers: 最大并发数
+            max_workers: 保留的兼容参数,安装不并发执行
+                (由包管理器单次调用完成,brew/apt持有全局锁,并发只会互相等待)
             options: 安装选项
         
         返回:
             Dict[str, bool]: {package_name: success}
+        
+        说明:
+            所有包合并为一次包管理器调用(如 brew install a b c),
+            启动开销只付一次;批量失败时由包管理器逐个重试。
+            brew/apt本身持有全局锁,并发安装也只会串行执行。
+            重复的包名只安装一次。
         """
-        manager = self.get_manager()
-        results = {}
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_package = {
-                executor.submit(manager.install, package, options): package 
-                for package in packages
-            }
-            
-            for future in as_completed(future_to_package):
-                package = future_to_package[future]
-                try:
-                    results[package] = future.result()
-                except Exception as e:
-                    logger.error(f"并发安装失败 ({package}): {e}")
-                    results[package] = False
+        packages = list(dict.fromkeys(packages))
+        if not packages:
+            return {}
         
-        return results
+        manager = self.get_manager()
+        try:
+            return manager.install_batch(packages, options)
+        except Exception as e:
+            logger.error(f"批量安装失败 ({', '.join(packages)}): {e}")
+            return {package: False for package in packages}
     
     def get_info_concurrent(
         self, 
         packages: List[str], 
-        max_workers: int = 5
+        max_workers: Optional[int] = None
     ) -> Dict[str, Optional[Dict[str, Any]]]:
         """
         并发获取多个软件包的详细信息
         
         参数:
             packages: 软件包名称列表
-            max_workers: 最大并发数
+            max_workers: 逐个查询时的最大并发数,默认按包数量和CPU数自动确定
         
         返回:
-            Dict[str, Optional[Dict]]: {package_name: info}
+            Dict[str, Optional[Dict]]: {package_name: info},按packages的顺序排列
+        
+        说明:
+            包管理器支持批量查询(supports_info_batch)时,通过info_batch一次查询全部包
+            (如 brew info --json=v2 a b c);不支持批量或批量失败
+            (如列表中有不存在的包)时,并发逐个查询。
+            重复的包名只查询一次。
         """
+        packages = list(dict.fromkeys(packages))
+        if not packages:
+            return {}
+        
         manager = self.get_manager()
-        results = {}
-        
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_package = {
-                executor.submit(manager.info, package): package 
-                for package in packages
-            }
-            
-            for future in as_completed(future_to_package):
-                package = future_to_package[future]
+        if manager.supports_info_batch:
+            try:
+                return manager.info_batch(packages)
+            except Exception as e:
+                logger.debug(f"批量获取信息失败,改为逐个获取: {e}")
+        
+        return self._run_concurrent(
+            manager.info, packages, max_workers,
+            default=None, error_message="并发获取信息失败"
+        )
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """
+        获取共享的线程池(首次使用时创建)
+        
+        说明:
+            所有并发操作复用同一个线程池,避免每次调用都创建和销毁线程;
+            线程池大小同时是所有调用方合计的并发上限,不会压垮包管理器;
+            进程退出时不等待未完成的任务。
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    executor = ThreadPoolExecutor(
+                        max_workers=_IO_WORKERS,
+                        thread_name_prefix="pm"
+                    )
+                    atexit.register(executor.shutdown, wait=False)
+                    PackageManagerFactory._executor = executor
+        return self._executor
+    
+    def _run_concurrent(
+        self,
+        func: Callable[[str], Any],
+        items: List[str],
+        max_workers: Optional[int],
+        default: Any,
+        error_message: str
+    ) -> Dict[str, Any]:
+        """
+        在共享线程池中并发执行func
+        
+        参数:
+            func: 对每个元素执行的函数
+            items: 元素列表
+            max_workers: 本次调用的最大并发数(同时在线程池中的任务数),
+                为None时取min(元素数, _IO_WORKERS)
+            default: 单个任务失败时的结果
+            error_message: 单个任务失败时的日志前缀
+        
+        返回:
+            Dict[str, Any]: {item: result},键的顺序与items一致(而不是完成顺序)
+        
+        说明:
+            重复的元素只执行一次(LLM生成的关键词列表常有重复)。
+            同一时间最多提交max_workers个任务,每完成一个再提交下一个,
+            不会让排队的任务占住共享线程池的线程,影响其他调用方。
+        """
+        # 先按输入顺序去重占位,完成后只更新值,迭代结果时保持输入顺序
+        results = dict.fromkeys(items)
+        if max_workers is None:
+            max_workers = min(len(results), _IO_WORKERS)
+        max_workers = max(1, max_workers)
+        
+        executor = self._get_executor()
+        pending_items = iter(results)
+        running: Dict[Any, str] = {}
+        
+        for item in pending_items:
+            running[executor.submit(func, item)] = item
+            if len(running) >= max_workers:
+                break
+        
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = running.pop(future)
                 try:
-                    results[package] = future.result()
+                    results[item] = future.result()
                 except Exception as e:
-                    logger.error(f"并发获取信息失败 ({package}): {e}")
-                    results[package] = None
+                    logger.error(f"{error_message} ({item}): {e}")
+                    results[item] = default
+                
+                next_item = next(pending_items, None)
+                if next_item is not None:
+                    running[executor.submit(func, next_item)] = next_item
         
         return results
 
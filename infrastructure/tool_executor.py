@@ -29,14 +29,50 @@
         print(result["error"])
 """
 
+import functools
 import json
-from typing import Dict, Any, List
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from infrastructure.logger import logger
-from infrastructure.mac_controller import MacController
-from service.package_service import PackageService
 from domain.exceptions import MacControlError
 
 
+# 查询类工具结果的缓存有效期(秒)和最大条目数,
+# 同一会话中"搜索 → 安装 → 查看已安装"常会重复同样的查询
+_RESULT_CACHE_TTL = 60.0
+_RESULT_CACHE_SIZE = 256
+_INSTALLED_KEY = ("list_installed_software",)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_package_service():
+    """
+    获取共享的软件包管理服务(首次调用时导入并创建)
+    
+    说明:
+        PackageService会创建AI客户端和仓储,只打开/退出应用的会话用不到;
+        多次创建ToolExecutor(如每个会话一个)时复用同一个实例
+    """
+    from service.package_service import PackageService
+    return PackageService()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_mac_controller():
+    """
+    获取共享的Mac系统控制器(首次调用时导入并创建)
+    
+    说明:
+        只搜索/安装软件的会话不需要加载控制器;
+        多次创建ToolExecutor时复用同一个实例
+    """
+    from infrastructure.mac_controller import MacController
+    return MacController()
+
+
 class ToolExecutor:
     """
     工具执行器
@@ -44,6 +80,9 @@ class ToolExecutor:
     属性:
         package_service: 软件包管理服务
         mac_controller: Mac系统控制器
+        _handlers: 工具名称 -> 处理方法的分发表
+        _result_cache: 查询类工具的结果缓存,(工具, 参数...) -> (过期时间, 结果)
+        _result_cache_lock: 保护_result_cache(服务端多个请求线程共用一个执行器)
     
     设计说明:
         作为工具调用的中央分发器,负责:
@@ -57,12 +96,31 @@ class ToolExecutor:
         初始化工具执行器
         
         说明:
-            初始化所需的服务和控制器
+            服务和控制器在首次访问时才加载,见package_service/mac_controller
         """
-        self.package_service = PackageService()
-        self.mac_controller = MacController()
+        self._handlers = {
+            "search_software": self._search_software,
+            "install_software": self._install_software,
+            "list_installed_software": self._list_installed_software,
+            "open_app": self._open_app,
+            "quit_app": self._quit_app,
+            "check_app_status": self._check_app_status,
+            "get_system_info": self._get_system_info,
+        }
+        self._result_cache: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._result_cache_lock = threading.Lock()
         logger.debug("ToolExecutor初始化完成")
     
+    @functools.cached_property
+    def package_service(self):
+        """软件包管理服务(首次访问时加载)"""
+        return _get_package_service()
+    
+    @functools.cached_property
+    def mac_controller(self):
+        """Mac系统控制器(首次访问时加载)"""
+        return _get_mac_controller()
+    
     def execute(self, function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
         执行工具调用
@@ -79,8 +137,8 @@ class ToolExecutor:
         
         工作流程:
             1. 记录工具调用
-            2. 根据函数名分发到对应处理方法
-            3. 捕获异常并格式化错误
+            2. 通过分发表查找函数名对应的处理方法
+            3. 捕获异常并格式化错误(仅在DEBUG级别记录堆栈)
             4. 返回统一格式的结果
         
         示例:
@@ -89,31 +147,24 @@ class ToolExecutor:
             >>> result["success"]
             True
         """
-        logger.info(f"执行工具调用: {function_name}, 参数: {arguments}")
+        logger.info("执行工具调用: %s, 参数: %s", function_name, arguments)
+        
+        handler = self._handlers.get(function_name)
+        if handler is None:
+            return {
+                "success": False,
+                "error": f"未知的工具: {function_name}"
+            }
         
         try:
-            if function_name == "search_software":
-                return self._search_software(arguments)
-            elif function_name == "install_software":
-                return self._install_software(arguments)
-            elif function_name == "list_installed_software":
-                return self._list_installed_software(arguments)
-            elif function_name == "open_app":
-                return self._open_app(arguments)
-            elif function_name == "quit_app":
-                return self._quit_app(arguments)
-            elif function_name == "check_app_status":
-                return self._check_app_status(arguments)
-            elif function_name == "get_system_info":
-                return self._get_system_info(arguments)
-            else:
-                return {
-                    "success": False,
-                    "error": f"未知的工具: {function_name}"
-                }
+            return handler(arguments)
         
         except Exception as e:
-            logger.error(f"工具执行失败: {function_name}, 错误: {e}", exc_info=True)
+            # 格式化堆栈的代价远高于普通日志,只在调试级别输出
+            logger.error(
+                "工具执行失败: %s, 错误: %s", function_name, e,
+                exc_info=logger.isEnabledFor(logging.DEBUG)
+            )
             return {
                 "success": False,
                 "error": f"工具执行失败: {str(e)}"
@@ -128,6 +179,9 @@ class ToolExecutor:
         
         返回:
             Dict: 搜索结果
+        
+        说明:
+            成功的结果按(query, max_results)缓存_RESULT_CACHE_TTL秒
         """
         query = arguments.get("query", "")
         max_results = arguments.get("max_results", 5)
@@ -138,6 +192,11 @@ class ToolExecutor:
                 "error": "搜索关键词不能为空"
             }
         
+        cache_key = ("search_software", query, max_results)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
         result = self.package_service.search_packages(query, max_results=max_results)
         
         packages_data = [
@@ -150,7 +209,7 @@ class ToolExecutor:
             for pkg in result.packages
         ]
         
-        return {
+        return self._store(cache_key, {
             "success": True,
             "data": {
                 "keyword": result.keyword,
@@ -158,7 +217,7 @@ class ToolExecutor:
                 "total_count": result.total_count,
                 "packages": packages_data
             }
-        }
+        })
     
     def _install_software(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -184,6 +243,8 @@ class ToolExecutor:
         success = self.package_service.install_package(package_name)
         
         if success:
+            with self._result_cache_lock:
+                self._result_cache.pop(_INSTALLED_KEY, None)
             return {
                 "success": True,
                 "data": {
@@ -206,7 +267,14 @@ class ToolExecutor:
         
         返回:
             Dict: 已安装软件列表
+        
+        说明:
+            结果缓存_RESULT_CACHE_TTL秒,安装成功后立即失效
         """
+        cached = self._get_cached(_INSTALLED_KEY)
+        if cached is not None:
+            return cached
+        
         packages = self.package_service.list_installed_packages()
         
         packages_data = [
@@ -218,13 +286,13 @@ class ToolExecutor:
             for pkg in packages
         ]
         
-        return {
+        return self._store(_INSTALLED_KEY, {
             "success": True,
             "data": {
                 "count": len(packages_data),
                 "packages": packages_data
             }
-        }
+        })
     
     def _open_app(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -350,3 +418,42 @@ class ToolExecutor:
                 "success": False,
                 "error": str(e)
             }
+    
+    def _get_cached(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        读取未过期的工具结果缓存
+        
+        参数:
+            key: (工具名称, 参数...)
+        
+        返回:
+            Optional[Dict]: 缓存结果的浅拷贝,未命中或已过期时返回None;
+                其中的data与缓存共享,调用方只能读取
+        """
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._result_cache[key]
+                return None
+            self._result_cache.move_to_end(key)
+        return dict(entry[1])
+    
+    def _store(self, key: Tuple, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        缓存工具结果,超出容量时淘汰最久未使用的条目
+        
+        参数:
+            key: (工具名称, 参数...)
+            result: 工具结果
+        
+        返回:
+            Dict: 原样返回result,便于在return语句中使用
+        """
+        with self._result_cache_lock:
+            self._result_cache[key] = (time.monotonic() + _RESULT_CACHE_TTL, result)
+            self._result_cache.move_to_end(key)
+            if len(self._result_cache) > _RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+        return result
@@ -143,6 +143,11 @@ TOOLS = [
     }
 ]
 
+# 名称索引在导入时构建一次,按名称查询工具时无需遍历TOOLS
+_TOOLS_BY_NAME = {tool["function"]["name"]: tool for tool in TOOLS}
+_TOOL_NAMES = tuple(_TOOLS_BY_NAME)
+_TOOL_NAME_SET = frozenset(_TOOL_NAMES)
+
 
 def get_tool_schemas() -> List[Dict[str, Any]]:
     """
@@ -174,7 +179,28 @@ def get_tool_names() -> List[str]:
         >>> 'search_software' in names
         True
     """
-    return [tool["function"]["name"] for tool in TOOLS]
+    return list(_TOOL_NAMES)
+
+
+def is_tool(name: str) -> bool:
+    """
+    检查名称是否为已定义的工具
+    
+    参数:
+        name: 工具名称
+    
+    返回:
+        bool: 是否存在该工具
+    
+    说明:
+        基于预先构建的frozenset,O(1)查询且不分配新列表,
+        用于替代 name in get_tool_names()
+    
+    示例:
+        >>> is_tool("search_software")
+        True
+    """
+    return name in _TOOL_NAME_SET
 
 
 def get_tool_by_name(name: str) -> Dict[str, Any]:
@@ -192,7 +218,4 @@ def get_tool_by_name(name: str) -> Dict[str, Any]:
         >>> tool["function"]["name"]
         'search_software'
     """
-    for tool in TOOLS:
-        if tool["function"]["name"] == name:
-            return tool
-    return None
+    return _TOOLS_BY_NAME.get(name)
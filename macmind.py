@@ -5,7 +5,39 @@ MacMind - AI 驱动的软件管理工具
 命令行入口文件
 """
 
-from controller.cli_controller import CLIController
+import os
+import sys
+
+# 直通brew的原始子命令,不需要AI和控制器,直接替换当前进程执行
+_RAW_COMMANDS = {
+    'install-raw': 'install',
+    'search-raw': 'search',
+}
+
+
+def _exec_raw(argv):
+    """
+    执行原始直通子命令
+    
+    参数:
+        argv: 命令行参数列表(同sys.argv)
+    
+    说明:
+        argv[1]不是原始子命令时直接返回;
+        否则用os.execvp将当前进程替换为brew,成功时不会返回,
+        省去加载控制器/服务/仓储层的导入开销
+    
+    示例:
+        python macmind.py install-raw wget  ->  brew install wget
+    """
+    if len(argv) < 2 or argv[1] not in _RAW_COMMANDS:
+        return
+    
+    try:
+        os.execvp('brew', ['brew', _RAW_COMMANDS[argv[1]]] + argv[2:])
+    except OSError as e:
+        print(f"❌ 无法执行brew: {e}", file=sys.stderr)
+        sys.exit(1)
 
 
 def main():
@@ -13,13 +45,17 @@ def main():
     主函数 - CLI入口
     
     功能:
-        创建CLIController实例并运行
+        原始子命令直接交给brew执行,其余创建CLIController实例并运行
     
     使用方法:
         python macmind.py search 绘图软件
         python macmind.py install drawio
         python macmind.py list
+        python macmind.py install-raw wget
     """
+    _exec_raw(sys.argv)
+    
+    from controller.cli_controller import CLIController
     controller = CLIController()
     controller.run()
 
@@ -16,8 +16,8 @@
 缓存策略：
 - 搜索结果缓存：TTL = 配置的cache_ttl（默认3600秒）
 - 包信息缓存：TTL = 配置的cache_ttl（默认3600秒）
-- 缓存位置：~/.macmind/cache/
-- 缓存格式：JSON文件
+- 缓存位置：~/.macmind/cache/cache.db（SQLite，search/info两张表）
+- 缓存格式：JSON字节串（安装了orjson时用orjson读写）
 
 错误处理：
 - 缓存读取失败：自动回退到API调用
@@ -43,8 +43,13 @@
 """
 
 import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, Tuple
 from datetime import datetime
 
 from domain.package import Package, PackageType, LicenseType
@@ -53,6 +58,83 @@ from infrastructure.package_manager_factory import package_manager_factory
 from infrastructure.logger import logger
 from infrastructure.config import config
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖,缺失时回退到标准库json
+    orjson = None
+
+
+def _dump_cache(data: Any) -> bytes:
+    """
+    将缓存数据序列化为UTF-8字节串
+    
+    说明:
+        优先使用orjson(比标准库快数倍,直接生成bytes);
+        未安装orjson时回退到标准库json。缓存文件不需要人工阅读,不缩进。
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _load_cache(raw: bytes) -> Any:
+    """
+    解析缓存文件内容
+    
+    抛出:
+        json.JSONDecodeError: 内容不是合法JSON(orjson的异常也是其子类)
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _copy_package(package: Package) -> Package:
+    """
+    复制Package对象(连同依赖列表)
+    
+    说明:
+        内存缓存中的Package与返回给调用方的对象互相独立,
+        调用方修改返回值(如is_installed)不会污染缓存。
+    """
+    return replace(package, dependencies=list(package.dependencies))
+
+
+# 缓存表: key为搜索关键词或包名, payload为JSON字节串, mtime为写入时间(time.time())
+# snapshot表保存整体状态的快照,目前只有已安装包列表(key为_INSTALLED_KEY)
+_CACHE_TABLES = ('search', 'info', 'snapshot')
+_INSTALLED_KEY = 'installed'
+
+# 已安装包快照的有效期(秒),在macmind之外安装/卸载的软件最多延迟这么久才反映出来
+_INSTALLED_TTL = 900
+
+# brew返回的常见SPDX许可证标识(规范化为大写、'-'分隔后),直接查表
+_LICENSE_EXACT = {
+    'MIT': LicenseType.MIT,
+    'APACHE-2.0': LicenseType.APACHE_2_0,
+    'GPL-3.0': LicenseType.GPL_3_0,
+    'GPL-3.0-ONLY': LicenseType.GPL_3_0,
+    'GPL-3.0-OR-LATER': LicenseType.GPL_3_0,
+    'BSD-2-CLAUSE': LicenseType.BSD,
+    'BSD-3-CLAUSE': LicenseType.BSD,
+}
+
+# 许可证字符串规范化: 空格和下划线统一为'-'(一次translate完成)
+_LICENSE_TRANS = str.maketrans({' ': '-', '_': '-'})
+
+# 查表未命中时按顺序做子串匹配,先匹配到的优先
+_LICENSE_PATTERNS = (
+    ('MIT', LicenseType.MIT),
+    ('APACHE', LicenseType.APACHE_2_0),
+    ('GPL', LicenseType.GPL_3_0),
+    ('BSD', LicenseType.BSD),
+    ('PROPRIETARY', LicenseType.PROPRIETARY),
+    ('COMMERCIAL', LicenseType.PROPRIETARY),
+)
+
+# 进程内内存缓存的最大条目数(每种缓存各自计数),超出时淘汰最久未使用的条目
+_MEM_CACHE_SIZE = 1024
+
 
 class PackageRepository:
     """
@@ -62,14 +144,18 @@ class PackageRepository:
         cache_dir: 缓存目录路径 (~/.macmind/cache/)
         cache_ttl: 缓存有效期（秒）
         _installed_cache: 已安装包的内存缓存
+        _db: 缓存数据库连接（首次读写缓存时打开）
+        _search_mem: 搜索结果的内存缓存，keyword -> (过期时间, 包名列表)
+        _info_mem: 包信息的内存缓存，包名 -> (过期时间, Package)
     
     设计说明：
         Repository模式将数据访问逻辑集中管理，提供统一的查询接口。
         Service层不需要知道数据来自API还是缓存，只需调用Repository的方法。
         
         缓存采用两级设计：
-        1. 文件缓存：持久化到磁盘，重启后仍然有效
-        2. 内存缓存：已安装包列表，避免重复调用brew list命令
+        1. 内存缓存：已查询过的搜索结果和Package对象（LRU），
+           以及已安装包列表，避免重复读盘反序列化和重复调用brew list命令
+        2. 磁盘缓存：单个SQLite文件，重启后仍然有效
     
     性能优化：
         - 搜索结果缓存：减少brew search调用
@@ -92,6 +178,14 @@ class PackageRepository:
         
         self._installed_cache: Optional[Set[str]] = None
         
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_path: Optional[Path] = None
+        self._db_lock = threading.Lock()
+        
+        self._search_mem: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self._info_mem: "OrderedDict[str, Tuple[float, Package]]" = OrderedDict()
+        self._mem_lock = threading.Lock()
+        
         self.package_manager = package_manager_factory.get_manager()
         
         logger.debug(f"PackageRepository初始化完成，缓存目录: {self.cache_dir}")
@@ -108,9 +202,9 @@ class PackageRepository:
             List[str]: 匹配的软件包名称列表
         
         缓存策略：
-            - 缓存key: search_{keyword}.json
+            - 缓存key: search表中的keyword
             - TTL: 配置的cache_ttl
-            - 缓存命中：直接返回缓存结果
+            - 缓存命中：直接返回缓存结果（先查内存，再查磁盘）
             - 缓存未命中或过期：调用brew search，更新缓存
         
         示例：
@@ -122,13 +216,18 @@ class PackageRepository:
             return []
         
         keyword = keyword.strip().lower()
-        cache_file = self.cache_dir / f"search_{keyword}.json"
         
-        if self._is_cache_valid(cache_file):
+        results = self._get_mem(self._search_mem, keyword)
+        if results is not None:
+            return list(results)
+        
+        raw = self._read_cache('search', keyword)
+        if raw is not None:
             logger.debug(f"命中搜索缓存: {keyword}")
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                results = _load_cache(raw)
+                self._put_mem(self._search_mem, keyword, results)
+                return list(results)
             except Exception as e:
                 logger.warning(f"读取搜索缓存失败: {e}，回退到API调用")
         
@@ -136,11 +235,11 @@ class PackageRepository:
             logger.info(f"搜索软件包: {keyword}")
             results = brew.search(keyword)
             
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(results, f)
+            self._write_cache('search', keyword, _dump_cache(results))
+            self._put_mem(self._search_mem, keyword, results)
             
             logger.debug(f"搜索成功，找到 {len(results)} 个结果")
-            return results
+            return list(results)
             
         except RuntimeError as e:
             logger.error(f"搜索失败: {e}")
@@ -157,6 +256,7 @@ class PackageRepository:
             Package: Package实体对象，如果未找到则返回None
         
         数据流：
+            0. 检查内存缓存，命中时返回已构建Package对象的副本
             1. 检查缓存是否有效
             2. 缓存命中：反序列化为Package对象
             3. 缓存未命中：调用brew info获取数据
@@ -164,7 +264,7 @@ class PackageRepository:
             5. 更新缓存：序列化Package对象
         
         缓存策略：
-            - 缓存key: info_{package_name}.json
+            - 缓存key: info表中的package_name
             - TTL: 配置的cache_ttl
         
         错误处理：
@@ -183,14 +283,18 @@ class PackageRepository:
             return None
         
         package_name = package_name.strip()
-        cache_file = self.cache_dir / f"info_{package_name}.json"
         
-        if self._is_cache_valid(cache_file):
+        package = self._get_mem(self._info_mem, package_name)
+        if package is not None:
+            return _copy_package(package)
+        
+        raw = self._read_cache('info', package_name)
+        if raw is not None:
             logger.debug(f"命中包信息缓存: {package_name}")
             try:
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    return self._dict_to_package(data)
+                package = self._dict_to_package(_load_cache(raw))
+                self._put_mem(self._info_mem, package_name, _copy_package(package))
+                return package
             except Exception as e:
                 logger.warning(f"读取包信息缓存失败: {e}，回退到API调用")
         
@@ -203,8 +307,8 @@ class PackageRepository:
             is_installed = self._check_if_installed(package_name)
             package.is_installed = is_installed
             
-            with open(cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self._package_to_dict(package), f, indent=2, ensure_ascii=False)
+            self._write_cache('info', package_name, _dump_cache(self._package_to_dict(package)))
+            self._put_mem(self._info_mem, package_name, _copy_package(package))
             
             logger.debug(f"包信息获取成功: {package.name}")
             return package
@@ -225,13 +329,14 @@ class PackageRepository:
         
         缓存策略：
             - 使用内存缓存（_installed_cache）
-            - 只在首次调用时查询brew list
+            - 首次调用时先读取磁盘快照（15分钟内有效），
+              没有有效快照时才查询brew list
             - 后续调用直接返回缓存结果
             - 可通过refresh_installed_cache()刷新
         
         性能优化：
             brew list命令可能比较慢（特别是安装了很多软件时），
-            因此使用内存缓存避免重复调用。
+            因此使用内存缓存避免重复调用，磁盘快照让新启动的进程也不必调用。
         
         示例：
             installed = repo.list_installed()
@@ -241,6 +346,16 @@ class PackageRepository:
             logger.debug("使用已安装包的内存缓存")
             return list(self._installed_cache)
         
+        raw = self._read_cache('snapshot', _INSTALLED_KEY, ttl=_INSTALLED_TTL)
+        if raw is not None:
+            try:
+                installed = _load_cache(raw)
+                self._installed_cache = set(installed)
+                logger.debug("使用已安装包的磁盘快照")
+                return installed
+            except Exception as e:
+                logger.warning(f"读取已安装包快照失败: {e}，回退到重新查询")
+        
         return self.refresh_installed_cache()
     
     def refresh_installed_cache(self) -> List[str]:
@@ -254,14 +369,21 @@ class PackageRepository:
             - 安装或卸载软件后，调用此方法刷新缓存
             - 确保list_installed()返回最新数据
         
+        说明：
+            同时清空包信息的内存缓存，其中的is_installed可能已过时；
+            查询成功后把结果写入磁盘快照
+        
         示例：
             repo.refresh_installed_cache()
             installed = repo.list_installed()  # 获取最新的安装列表
         """
         try:
             logger.info("刷新已安装包列表")
+            with self._mem_lock:
+                self._info_mem.clear()
             installed = self.package_manager.list_installed()
             self._installed_cache = set(installed)
+            self._write_cache('snapshot', _INSTALLED_KEY, _dump_cache(sorted(self._installed_cache)))
             logger.debug(f"已安装 {len(installed)} 个软件包")
             return installed
         except RuntimeError as e:
@@ -280,20 +402,62 @@ class PackageRepository:
             List[Optional[Package]]: Package对象列表
         
         性能优化:
-            使用并发执行,比逐个查询快得多
+            通过get_package_info_many一次读出已缓存的包,未命中的并发查询
         
         示例:
             packages = repo.get_package_info_batch(['vim', 'git', 'wget'])
         """
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        packages = self.get_package_info_many(package_names)
+        return [packages.get(name) for name in package_names]
+    
+    def get_package_info_many(self, package_names: List[str]) -> Dict[str, Optional[Package]]:
+        """
+        批量获取多个软件包的详细信息
+        
+        参数:
+            package_names: 软件包名称列表
+        
+        返回:
+            Dict[str, Optional[Package]]: {包名: Package对象或None},按package_names的顺序排列
+        
+        性能优化:
+            先查内存缓存,其余已缓存的包用一次查询(WHERE key IN (...))全部读出;
+            未命中的包用一次 brew info --json=v2 a b c 获取并在一个事务中写入缓存,
+            批量调用失败(如列表中有不存在的包)时才并发调用get_package_info;
+            重复的包名只查询一次
+        
+        示例:
+            packages = repo.get_package_info_many(['vim', 'git', 'wget'])
+            vim = packages['vim']
+        """
+        results: Dict[str, Optional[Package]] = dict.fromkeys(package_names)
         
-        max_workers = min(10, len(package_names))
-        results = {}
+        for name in results:
+            package = self._get_mem(self._info_mem, name)
+            if package is not None:
+                results[name] = _copy_package(package)
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        uncached = [name for name, package in results.items() if package is None]
+        for name, raw in self._read_cache_many('info', uncached).items():
+            try:
+                results[name] = package = self._dict_to_package(_load_cache(raw))
+                self._put_mem(self._info_mem, name, _copy_package(package))
+            except Exception as e:
+                logger.warning(f"读取包信息缓存失败 ({name}): {e}，回退到API调用")
+        
+        missing = [name for name, package in results.items() if package is None]
+        if len(missing) > 1:
+            results.update(self._fetch_info_batch(missing))
+            missing = [name for name in missing if results[name] is None]
+        if not missing:
+            return results
+        
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        with ThreadPoolExecutor(max_workers=min(10, len(missing))) as executor:
             future_to_name = {
                 executor.submit(self.get_package_info, name): name 
-                for name in package_names
+                for name in missing
             }
             
             for future in as_completed(future_to_name):
@@ -302,15 +466,49 @@ class PackageRepository:
                     results[name] = future.result()
                 except Exception as e:
                     logger.warning(f"批量获取包信息失败 ({name}): {e}")
-                    results[name] = None
         
-        return [results.get(name) for name in package_names]
+        return results
+    
+    def _fetch_info_batch(self, package_names: List[str]) -> Dict[str, Package]:
+        """
+        用一次brew info调用获取多个包的信息并写入缓存
+        
+        参数:
+            package_names: 未命中缓存的包名列表
+        
+        返回:
+            Dict[str, Package]: 成功获取的包;批量调用失败时返回空字典,由调用方逐个获取
+        """
+        try:
+            infos = brew.info_batch(package_names)
+        except Exception as e:
+            logger.debug(f"批量获取包信息失败,改为逐个获取: {e}")
+            return {}
+        
+        packages: Dict[str, Package] = {}
+        rows = []
+        for name, brew_data in infos.items():
+            if brew_data is None:
+                continue
+            try:
+                package = self._brew_to_package(brew_data)
+                package.is_installed = self._check_if_installed(name)
+            except Exception as e:
+                logger.error(f"处理包信息时发生错误 ({name}): {e}", exc_info=True)
+                continue
+            packages[name] = package
+            rows.append((name, _dump_cache(self._package_to_dict(package))))
+            self._put_mem(self._info_mem, name, _copy_package(package))
+        
+        self._write_cache_many('info', rows)
+        logger.debug(f"批量获取包信息成功: {len(packages)}/{len(package_names)}")
+        return packages
     
     def clear_cache(self):
         """
         清空所有缓存
         
-        清空文件缓存和内存缓存。
+        清空磁盘缓存和所有内存缓存。
         适用于调试或强制刷新数据的场景。
         
         示例：
@@ -319,50 +517,204 @@ class PackageRepository:
         """
         logger.info("清空缓存")
         
+        try:
+            with self._db_lock:
+                db = self._get_db()
+                for table in _CACHE_TABLES:
+                    db.execute(f"DELETE FROM {table}")
+        except sqlite3.Error as e:
+            logger.warning(f"清空缓存数据库失败: {e}")
+        
+        # 旧版本按关键词/包名写入的单个JSON缓存文件
         for cache_file in self.cache_dir.glob('*.json'):
             try:
                 cache_file.unlink()
             except Exception as e:
                 logger.warning(f"删除缓存文件失败 ({cache_file}): {e}")
         
+        with self._mem_lock:
+            self._search_mem.clear()
+            self._info_mem.clear()
         self._installed_cache = None
         logger.info("缓存已清空")
     
-    def _is_cache_valid(self, cache_file: Path) -> bool:
+    def _get_mem(self, cache: OrderedDict, key: str) -> Any:
         """
-        检查缓存文件是否有效
+        查询内存缓存
         
         参数：
-            cache_file: 缓存文件路径
+            cache: _search_mem或_info_mem
+            key: 搜索关键词或包名
         
         返回：
-            bool: 缓存有效返回True，否则返回False
+            缓存的值；不存在或已过期时返回None
+        """
+        with self._mem_lock:
+            entry = cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del cache[key]
+                return None
+            cache.move_to_end(key)
+        return entry[1]
+    
+    def _put_mem(self, cache: OrderedDict, key: str, value: Any):
+        """
+        写入内存缓存，超出容量时淘汰最久未使用的条目
         
-        有效条件：
-            1. 文件存在
-            2. 文件修改时间在TTL范围内
+        参数：
+            cache: _search_mem或_info_mem
+            key: 搜索关键词或包名
+            value: 搜索结果列表或Package对象
+        """
+        with self._mem_lock:
+            cache[key] = (time.monotonic() + self.cache_ttl, value)
+            cache.move_to_end(key)
+            if len(cache) > _MEM_CACHE_SIZE:
+                cache.popitem(last=False)
+    
+    def _get_db(self) -> sqlite3.Connection:
+        """
+        获取缓存数据库连接（调用方需持有_db_lock）
+        
+        返回：
+            sqlite3.Connection: cache_dir/cache.db 的连接
         
         实现细节：
-            使用文件的mtime（修改时间）判断缓存年龄。
-            如果 (当前时间 - mtime) < cache_ttl，则缓存有效。
+            首次使用时打开并建表；cache_dir被修改后重新打开。
+            autocommit模式 + WAL日志，每次写入一次提交，读写互不阻塞。
+            连接在线程间共享，由_db_lock串行化访问。
+        """
+        path = self.cache_dir / 'cache.db'
+        if self._db is None or self._db_path != path:
+            if self._db is not None:
+                self._db.close()
+            db = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            for table in _CACHE_TABLES:
+                db.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    "(key TEXT PRIMARY KEY, payload BLOB NOT NULL, mtime REAL NOT NULL)"
+                )
+            self._db = db
+            self._db_path = path
+        return self._db
+    
+    def _read_cache(self, table: str, key: str, ttl: Optional[float] = None) -> Optional[bytes]:
         """
-        if not cache_file.exists():
-            return False
+        读取未过期的缓存内容
         
+        参数：
+            table: 缓存表（search、info或snapshot）
+            key: 搜索关键词或包名
+            ttl: 有效期（秒），默认为cache_ttl
+        
+        返回：
+            bytes: 缓存的JSON字节串；不存在、已过期或读取失败时返回None
+        
+        实现细节：
+            过期判断由查询条件 mtime > 当前时间 - cache_ttl 完成，
+            一次查询同时完成存在性检查、有效期检查和读取。
+        """
         try:
-            mtime = datetime.fromtimestamp(cache_file.stat().st_mtime)
-            age_seconds = (datetime.now() - mtime).total_seconds()
-            
-            is_valid = age_seconds < self.cache_ttl
-            
-            if not is_valid:
-                logger.debug(f"缓存已过期: {cache_file.name} (年龄: {age_seconds:.0f}秒)")
-            
-            return is_valid
-            
-        except Exception as e:
-            logger.warning(f"检查缓存有效性失败: {e}")
-            return False
+            with self._db_lock:
+                row = self._get_db().execute(
+                    f"SELECT payload FROM {table} WHERE key = ? AND mtime > ?",
+                    (key, time.time() - (self.cache_ttl if ttl is None else ttl))
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"读取缓存失败 ({table}/{key}): {e}")
+            return None
+        return row[0] if row else None
+    
+    def _read_cache_many(self, table: str, keys: List[str]) -> Dict[str, bytes]:
+        """
+        批量读取未过期的缓存内容
+        
+        参数：
+            table: 缓存表（search或info）
+            keys: 搜索关键词或包名列表
+        
+        返回：
+            Dict[str, bytes]: {key: 缓存的JSON字节串}，只包含命中的key
+        
+        实现细节：
+            使用 WHERE key IN (...) 查询，每批不超过500个参数
+            （低于SQLite默认的变量数上限）。
+        """
+        found: Dict[str, bytes] = {}
+        if not keys:
+            return found
+        
+        cutoff = time.time() - self.cache_ttl
+        try:
+            with self._db_lock:
+                db = self._get_db()
+                for i in range(0, len(keys), 500):
+                    chunk = keys[i:i + 500]
+                    placeholders = ','.join('?' * len(chunk))
+                    found.update(db.execute(
+                        f"SELECT key, payload FROM {table} "
+                        f"WHERE key IN ({placeholders}) AND mtime > ?",
+                        (*chunk, cutoff)
+                    ))
+        except sqlite3.Error as e:
+            logger.warning(f"批量读取缓存失败 ({table}): {e}")
+        return found
+    
+    def _write_cache(self, table: str, key: str, payload: bytes):
+        """
+        写入缓存（已存在时覆盖并更新写入时间）
+        
+        参数：
+            table: 缓存表（search或info）
+            key: 搜索关键词或包名
+            payload: JSON字节串
+        
+        错误处理：
+            写入失败只记录警告，不影响本次查询结果
+        """
+        try:
+            with self._db_lock:
+                self._get_db().execute(
+                    f"INSERT OR REPLACE INTO {table} (key, payload, mtime) VALUES (?, ?, ?)",
+                    (key, payload, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"写入缓存失败 ({table}/{key}): {e}")
+    
+    def _write_cache_many(self, table: str, rows: List[Tuple[str, bytes]]):
+        """
+        在一个事务中批量写入缓存
+        
+        参数：
+            table: 缓存表（search或info）
+            rows: [(key, JSON字节串)]
+        
+        错误处理：
+            写入失败时回滚并记录警告，不影响本次查询结果
+        """
+        if not rows:
+            return
+        
+        now = time.time()
+        try:
+            with self._db_lock:
+                db = self._get_db()
+                db.execute("BEGIN")
+                try:
+                    db.executemany(
+                        f"INSERT OR REPLACE INTO {table} (key, payload, mtime) VALUES (?, ?, ?)",
+                        [(key, payload, now) for key, payload in rows]
+                    )
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                db.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.warning(f"批量写入缓存失败 ({table}): {e}")
     
     def _brew_to_package(self, brew_data: Dict[str, Any]) -> Package:
         """
@@ -465,21 +817,18 @@ class PackageRepository:
         if not license_str or license_str == 'Unknown':
             return LicenseType.UNKNOWN
         
-        license_upper = license_str.upper().replace(' ', '-').replace('_', '-')
-        
-        if 'MIT' in license_upper:
-            return LicenseType.MIT
-        elif 'APACHE' in license_upper or 'APACHE-2' in license_upper:
-            return LicenseType.APACHE_2_0
-        elif 'GPL' in license_upper or 'GPL-3' in license_upper:
-            return LicenseType.GPL_3_0
-        elif 'BSD' in license_upper:
-            return LicenseType.BSD
-        elif 'PROPRIETARY' in license_upper or 'COMMERCIAL' in license_upper:
-            return LicenseType.PROPRIETARY
-        else:
-            logger.debug(f"未知许可证类型: {license_str}")
-            return LicenseType.UNKNOWN
+        license_upper = license_str.translate(_LICENSE_TRANS).upper()
+        
+        license_type = _LICENSE_EXACT.get(license_upper)
+        if license_type is not None:
+            return license_type
+        
+        for pattern, license_type in _LICENSE_PATTERNS:
+            if pattern in license_upper:
+                return license_type
+        
+        logger.debug(f"未知许可证类型: {license_str}")
+        return LicenseType.UNKNOWN
     
     def _check_if_installed(self, package_name: str) -> bool:
         """
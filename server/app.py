@@ -16,6 +16,7 @@ Flask Web服务器 - Flask Web Server
 from flask import Flask, render_template, request, jsonify
 from flask_socketio import SocketIO, emit
 from flask_cors import CORS
+import functools
 import json
 import sys
 import os
@@ -28,6 +29,11 @@ from infrastructure.tools import get_tool_schemas
 from infrastructure.tool_executor import ToolExecutor
 from infrastructure.logger import logger
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖,缺失时回退到标准库json
+    orjson = None
+
 app = Flask(__name__, 
             static_folder='../frontend/static',
             template_folder='../frontend/templates')
@@ -36,6 +42,43 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 
 conversation_manager = ConversationManager()
 tool_executor = ToolExecutor()
+_TOOL_SCHEMAS = get_tool_schemas()
+
+# 每轮对话中AI连续调用工具的最大次数
+_MAX_TOOL_ITERATIONS = 5
+
+
+def _load_arguments(raw: str):
+    """解析工具调用参数(AI返回的JSON字符串),优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _dump_result(result) -> str:
+    """
+    序列化工具执行结果,作为tool消息内容发回给AI
+    
+    说明:
+        优先使用orjson(输出总是UTF-8,无需ensure_ascii);
+        消息内容要求是str,因此解码一次
+    """
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    return json.dumps(result, ensure_ascii=False)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_ai_client():
+    """
+    获取共享的AI客户端(首次请求时创建)
+    
+    说明:
+        所有请求和线程共用一个客户端,OpenAI客户端本身是线程安全的。
+        不在导入时创建,未配置API Key时服务仍能启动,由聊天接口返回错误;
+        创建失败不会被缓存,配置后下次请求会重试。
+    """
+    return create_ai_client()
 
 
 @app.route('/')
@@ -64,6 +107,94 @@ def health():
     })
 
 
+def _run_chat_turn(user_message):
+    """
+    执行一轮对话(可能包含多次工具调用),逐步产出事件
+    
+    参数:
+        user_message: 用户消息
+    
+    产出:
+        (事件名, 数据) 元组:
+        - ('tool_execution', {'function', 'arguments'}): 即将执行工具
+        - ('tool_result', {'function', 'arguments', 'result'}): 工具执行完成
+        - ('ai_response', {'message'}): AI的最终回复,之后结束
+        - ('error', {'error'}): 达到最大工具调用次数,之后结束
+    
+    抛出:
+        ValueError: AI响应格式无效或内容为空
+    
+    说明:
+        REST接口和WebSocket共用同一流程:
+        前者收集事件后一次性返回,后者把事件逐个推送给客户端
+    """
+    ai_client = _get_ai_client()
+    
+    conversation_manager.add_user_message(user_message)
+    
+    for _ in range(_MAX_TOOL_ITERATIONS):
+        context = conversation_manager.get_context()
+        
+        response = ai_client.client.chat.completions.create(
+            model=ai_client.model,
+            messages=context,
+            tools=_TOOL_SCHEMAS,
+            tool_choice="auto"
+        )
+        
+        if not response.choices:
+            raise ValueError("AI响应格式无效")
+        
+        message = response.choices[0].message
+        
+        if not message.tool_calls:
+            if not message.content:
+                raise ValueError("AI响应内容为空")
+            
+            conversation_manager.add_assistant_message(message.content)
+            yield 'ai_response', {'message': message.content}
+            return
+        
+        tool_calls_list = []
+        for tool_call in message.tool_calls:
+            tool_calls_list.append({
+                "id": tool_call.id,
+                "type": tool_call.type,
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments
+                }
+            })
+        
+        conversation_manager.add_tool_call_message(tool_calls_list)
+        
+        for tool_call in message.tool_calls:
+            function_name = tool_call.function.name
+            arguments = _load_arguments(tool_call.function.arguments)
+            
+            yield 'tool_execution', {
+                'function': function_name,
+                'arguments': arguments
+            }
+            
+            result = tool_executor.execute(function_name, arguments)
+            result_json = _dump_result(result)
+            
+            yield 'tool_result', {
+                'function': function_name,
+                'arguments': arguments,
+                'result': result
+            }
+            
+            conversation_manager.add_tool_result_message(
+                tool_call.id,
+                function_name,
+                result_json
+            )
+    
+    yield 'error', {'error': '达到最大工具调用次数限制'}
+
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
     """
@@ -87,83 +218,22 @@ def chat():
                 'error': '消息不能为空'
             }), 400
         
-        ai_client = create_ai_client()
-        tools = get_tool_schemas()
-        
-        conversation_manager.add_user_message(user_message)
-        
-        max_iterations = 5
-        iteration = 0
         tool_calls_log = []
         
-        while iteration < max_iterations:
-            iteration += 1
-            context = conversation_manager.get_context()
-            
-            response = ai_client.client.chat.completions.create(
-                model=ai_client.model,
-                messages=context,
-                tools=tools,
-                tool_choice="auto"
-            )
-            
-            if not response.choices:
-                raise ValueError("AI响应格式无效")
-            
-            message = response.choices[0].message
-            
-            if message.tool_calls:
-                tool_calls_list = []
-                for tool_call in message.tool_calls:
-                    tool_calls_list.append({
-                        "id": tool_call.id,
-                        "type": tool_call.type,
-                        "function": {
-                            "name": tool_call.function.name,
-                            "arguments": tool_call.function.arguments
-                        }
-                    })
-                
-                conversation_manager.add_tool_call_message(tool_calls_list)
-                
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    
-                    result = tool_executor.execute(function_name, arguments)
-                    result_json = json.dumps(result, ensure_ascii=False)
-                    
-                    tool_calls_log.append({
-                        'function': function_name,
-                        'arguments': arguments,
-                        'result': result
-                    })
-                    
-                    conversation_manager.add_tool_result_message(
-                        tool_call.id,
-                        function_name,
-                        result_json
-                    )
-                
-                continue
-            
-            else:
-                if not message.content:
-                    raise ValueError("AI响应内容为空")
-                
-                response_text = message.content
-                conversation_manager.add_assistant_message(response_text)
-                
+        for event, payload in _run_chat_turn(user_message):
+            if event == 'tool_result':
+                tool_calls_log.append(payload)
+            elif event == 'ai_response':
                 return jsonify({
                     'success': True,
-                    'message': response_text,
+                    'message': payload['message'],
                     'tool_calls': tool_calls_log
                 })
-        
-        return jsonify({
-            'success': False,
-            'error': '达到最大工具调用次数限制'
-        }), 500
+            elif event == 'error':
+                return jsonify({
+                    'success': False,
+                    'error': payload['error']
+                }), 500
     
     except Exception as e:
         logger.error(f"聊天接口错误: {e}", exc_info=True)
@@ -258,83 +328,16 @@ def handle_chat_message(data):
         
         emit('user_message', {'message': user_message})
         
-        ai_client = create_ai_client()
-        tools = get_tool_schemas()
-        
-        conversation_manager.add_user_message(user_message)
-        
-        max_iterations = 5
-        iteration = 0
-        
-        while iteration < max_iterations:
-            iteration += 1
-            context = conversation_manager.get_context()
-            
-            response = ai_client.client.chat.completions.create(
-                model=ai_client.model,
-                messages=context,
-                tools=tools,
-                tool_choice="auto"
-            )
-            
-            if not response.choices:
-                raise ValueError("AI响应格式无效")
-            
-            message = response.choices[0].message
-            
-            if message.tool_calls:
-                tool_calls_list = []
-                for tool_call in message.tool_calls:
-                    tool_calls_list.append({
-                        "id": tool_call.id,
-                        "type": tool_call.type,
-                        "function": {
-                            "name": tool_call.function.name,
-                            "arguments": tool_call.function.arguments
-                        }
-                    })
-                
-                conversation_manager.add_tool_call_message(tool_calls_list)
-                
-                for tool_call in message.tool_calls:
-                    function_name = tool_call.function.name
-                    arguments = json.loads(tool_call.function.arguments)
-                    
-                    emit('tool_execution', {
-                        'function': function_name,
-                        'arguments': arguments
-                    })
-                    
-                    result = tool_executor.execute(function_name, arguments)
-                    result_json = json.dumps(result, ensure_ascii=False)
-                    
-                    emit('tool_result', {
-                        'function': function_name,
-                        'success': result['success'],
-                        'data': result.get('data'),
-                        'error': result.get('error')
-                    })
-                    
-                    conversation_manager.add_tool_result_message(
-                        tool_call.id,
-                        function_name,
-                        result_json
-                    )
-                
-                continue
-            
-            else:
-                if not message.content:
-                    raise ValueError("AI响应内容为空")
-                
-                response_text = message.content
-                conversation_manager.add_assistant_message(response_text)
-                
-                emit('ai_response', {'message': response_text})
-                break
-        
-        if iteration >= max_iterations:
-            emit('error', {'error': '达到最大工具调用次数限制'})
+        for event, payload in _run_chat_turn(user_message):
+            if event == 'tool_result':
+                result = payload['result']
+                payload = {
+                    'function': payload['function'],
+                    'success': result['success'],
+                    'data': result.get('data'),
+                    'error': result.get('error')
+                }
+            emit(event, payload)
     
     except Exception as e:
         logger.error(f"WebSocket聊天错误: {e}", exc_info=True)
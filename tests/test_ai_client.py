@@ -13,6 +13,7 @@ import pytest
 import json
 from unittest.mock import Mock, patch, MagicMock
 from infrastructure.ai_client import AIClient, QiniuClient, create_ai_client
+from domain.exceptions import AIError
 
 
 class TestAIClientAbstract:
@@ -62,6 +63,19 @@ class TestQiniuClient:
             base_url='https://custom.endpoint.com/v1'
         )
     
+    @patch('infrastructure.ai_client._get_openai')
+    def test_clients_share_pooled_sdk_instance(self, mock_get_openai):
+        """测试相同密钥和端点复用同一个SDK客户端"""
+        mock_get_openai.return_value.OpenAI = Mock(side_effect=lambda **kw: Mock())
+        
+        first = QiniuClient('pool_key', base_url='https://pool.example.com/v1')
+        second = QiniuClient('pool_key', base_url='https://pool.example.com/v1')
+        other = QiniuClient('other_key', base_url='https://pool.example.com/v1')
+        
+        assert first.client is second.client, "相同配置应该共享SDK客户端"
+        assert other.client is not first.client, "不同密钥应该使用独立客户端"
+        assert mock_get_openai.return_value.OpenAI.call_count == 2
+    
     def test_client_missing_library(self):
         """测试openai库未安装"""
         with patch.dict('sys.modules', {'openai': None}):
@@ -91,6 +105,48 @@ class TestQiniuClient:
         assert result['keyword'] == '绘图软件', "应该正确提取关键词"
         assert result['category'] == '绘图', "应该正确识别类别"
     
+    @patch('infrastructure.ai_client._get_openai_client')
+    def test_analyze_intent_caches_normalized_input(self, mock_get_client):
+        """测试相同(规范化后)输入只调用一次模型"""
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content='{"intent":"搜索","keyword":"绘图","category":"绘图"}'))
+        ]
+        mock_get_client.return_value.chat.completions.create.return_value = mock_response
+        
+        client = QiniuClient('test_key')
+        first = client.analyze_intent("帮我找一个绘图软件")
+        first['keyword'] = 'changed'
+        second = client.analyze_intent("  帮我找一个绘图软件 ")
+        
+        assert second['keyword'] == '绘图', "缓存结果不应被调用方修改影响"
+        assert mock_get_client.return_value.chat.completions.create.call_count == 1
+    
+    @patch('infrastructure.ai_client._get_openai')
+    @patch('infrastructure.ai_client._get_openai_client')
+    def test_analyze_intents_async_runs_concurrently(self, mock_get_client, mock_get_openai):
+        """测试异步批量分析返回与输入一一对应的结果"""
+        import asyncio
+        
+        async def fake_create(**kwargs):
+            content = kwargs['messages'][0]['content']
+            keyword = 'vim' if 'vim' in content else '绘图'
+            return Mock(choices=[Mock(message=Mock(
+                content=json.dumps({'intent': '搜索', 'keyword': keyword, 'category': ''})
+            ))])
+        
+        mock_get_openai.return_value.AsyncOpenAI.return_value.chat.completions.create = fake_create
+        
+        client = QiniuClient('test_key')
+        results = asyncio.run(client.analyze_intents_async(["找绘图软件", "安装vim"]))
+        
+        assert [r['keyword'] for r in results] == ['绘图', 'vim'], "结果顺序应与输入一致"
+        mock_get_openai.return_value.AsyncOpenAI.assert_called_once()
+        
+        client._intent_cache.clear()
+        asyncio.run(client.analyze_intents_async(["找绘图软件"]))
+        assert mock_get_openai.return_value.AsyncOpenAI.call_count == 2, "新的事件循环应使用新的异步客户端"
+    
     @patch('openai.OpenAI')
     def test_analyze_intent_with_error_raises_exception(self, mock_openai):
         """测试分析失败时抛出异常(不再降级)"""
@@ -137,7 +193,43 @@ class TestQiniuClient:
         client.analyze_intent("test")
         
         call_args = mock_client.chat.completions.create.call_args
-        assert call_args[1]['response_format'] == {"type": "json_object"}, "应该强制JSON输出"
+        response_format = call_args[1]['response_format']
+        assert response_format['type'] == 'json_schema', "应该使用结构化输出"
+        assert response_format['json_schema']['schema']['properties']['intent']['enum'] == ['搜索', '安装', '查询']
+    
+    @patch('infrastructure.ai_client._get_openai_client')
+    def test_analyze_intent_falls_back_to_json_object(self, mock_get_client):
+        """测试端点不支持json_schema时退回json_object格式"""
+        rejected = Exception("response_format not supported")
+        rejected.status_code = 400
+        mock_response = Mock()
+        mock_response.choices = [
+            Mock(message=Mock(content='{"intent":"搜索","keyword":"test","category":""}'))
+        ]
+        create = mock_get_client.return_value.chat.completions.create
+        create.side_effect = [rejected, mock_response]
+        
+        client = QiniuClient('test_key')
+        result = client.analyze_intent("fallback test")
+        
+        assert result['keyword'] == 'test'
+        assert create.call_args[1]['response_format'] == {"type": "json_object"}
+        assert client._structured_output is False, "后续请求不应再尝试json_schema"
+    
+    @patch('infrastructure.ai_client._get_openai_client')
+    def test_unrelated_bad_request_keeps_structured_output(self, mock_get_client):
+        """测试与response_format无关的400错误不会关闭结构化输出"""
+        rejected = Exception("maximum context length exceeded")
+        rejected.status_code = 400
+        create = mock_get_client.return_value.chat.completions.create
+        create.side_effect = rejected
+        
+        client = QiniuClient('test_key')
+        with pytest.raises(AIError):
+            client.analyze_intent("too long")
+        
+        assert create.call_count == 1
+        assert client._structured_output is True
 
 
 class TestCreateAIClient:
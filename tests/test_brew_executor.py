@@ -239,6 +239,53 @@ class TestBrewExecutorInstall:
         assert kwargs['timeout'] == 300, "安装命令应该使用300秒超时"
 
 
+class TestBrewExecutorBatch:
+    """测试批量安装和批量查询"""
+    
+    @patch('subprocess.run')
+    def test_install_batch_single_invocation(self, mock_run):
+        """测试批量安装只调用一次brew"""
+        mock_run.return_value = Mock(stdout="Success", returncode=0)
+        
+        executor = BrewExecutor()
+        results = executor.install_batch(['wget', 'jq'])
+        
+        assert results == {'wget': True, 'jq': True}
+        mock_run.assert_called_once()
+        cmd = mock_run.call_args[0][0]
+        assert cmd[-3:] == ['install', 'wget', 'jq'], "所有包应该在同一条命令中"
+    
+    @patch('subprocess.run')
+    def test_install_batch_falls_back_per_package(self, mock_run):
+        """测试批量安装失败时逐个安装"""
+        def run(cmd, **kwargs):
+            if 'missing' in cmd:
+                raise subprocess.CalledProcessError(returncode=1, cmd=cmd, stderr='No formula')
+            return Mock(stdout="Success", returncode=0)
+        mock_run.side_effect = run
+        
+        executor = BrewExecutor()
+        results = executor.install_batch(['wget', 'missing'])
+        
+        assert results == {'wget': True, 'missing': False}
+        assert mock_run.call_count == 3, "一次批量调用加两次逐个调用"
+    
+    @patch('subprocess.run')
+    def test_info_batch_maps_formulae_and_casks(self, mock_run):
+        """测试批量查询按名称和别名对应结果"""
+        mock_run.return_value = Mock(stdout=json.dumps({
+            'formulae': [{'name': 'python@3.12', 'full_name': 'python@3.12', 'aliases': ['python3']}],
+            'casks': [{'token': 'drawio', 'full_token': 'drawio'}]
+        }), returncode=0)
+        
+        executor = BrewExecutor()
+        results = executor.info_batch(['python3', 'drawio'])
+        
+        assert results['python3']['name'] == 'python@3.12', "别名应该对应到formula"
+        assert results['drawio']['token'] == 'drawio', "应该返回cask信息"
+        mock_run.assert_called_once()
+
+
 class TestBrewExecutorListInstalled:
     """测试列出已安装包功能"""
     
@@ -2,16 +2,31 @@
 测试会话管理模块
 """
 
+import os
+
 import pytest
 from infrastructure.conversation import ConversationManager
 
 
 @pytest.fixture
 def conversation():
-    """创建会话管理器实例"""
+    """创建会话管理器实例(结束时恢复单例原来的历史上限)"""
+    original = ConversationManager().max_history
     manager = ConversationManager(max_history=10)
     manager.clear()
-    return manager
+    yield manager
+    manager.set_max_history(original)
+    manager.clear()
+
+
+@pytest.fixture
+def session_manager(tmp_path, monkeypatch):
+    """创建使用临时会话目录的会话管理器(结束时恢复会话目录并清空历史)"""
+    manager = ConversationManager()
+    monkeypatch.setattr(manager, "session_dir", tmp_path)
+    manager.clear_history()
+    yield manager
+    manager.clear_history()
 
 
 def test_add_user_message(conversation):
@@ -85,4 +100,115 @@ def test_trim_history(conversation):
     for i in range(10):
         manager.add_user_message(f"消息 {i}")
     
+    assert manager is conversation
+    assert manager.max_history == 5
     assert manager.get_message_count() <= 5
+
+
+def test_list_sessions_limit_by_mtime(session_manager, tmp_path):
+    """测试按修改时间列出最近的会话"""
+    manager = session_manager
+    
+    for i, name in enumerate(["a", "b", "c"]):
+        session_file = tmp_path / f"{name}_session.json"
+        session_file.write_text("{}", encoding="utf-8")
+        os.utime(session_file, (1000 + i, 1000 + i))
+    (tmp_path / "notes.txt").write_text("", encoding="utf-8")
+    
+    assert manager.list_sessions() == ["a", "b", "c"]
+    assert manager.list_sessions(limit=2) == ["a", "b"]
+    assert manager.list_sessions(limit=2, by_mtime=True) == ["c", "b"]
+
+
+def test_estimate_tokens_tracks_evicted_messages():
+    """测试token估算在消息被移除后保持一致"""
+    manager = ConversationManager()
+    manager.clear_history()
+    
+    for i in range(manager.max_history + 5):
+        manager.add_user_message(f"第{i}条消息 message {i}")
+    
+    expected = sum(manager._tokens_of(msg["content"]) for msg in manager.history)
+    assert manager.estimate_tokens() == expected
+    
+    manager.clear_history()
+    assert manager.estimate_tokens() == 0
+
+
+def test_save_session_background(session_manager):
+    """测试后台保存会话"""
+    manager = session_manager
+    manager.add_user_message("后台保存测试")
+    
+    assert manager.save_session("bg", background=True)
+    manager.commit_history()
+    
+    info = manager.get_session_info("bg")
+    assert info["message_count"] == 1
+
+
+def test_get_session_info_skips_history(session_manager, tmp_path):
+    """测试获取会话信息时不解析历史消息"""
+    manager = session_manager
+    manager.add_user_message("history")
+    manager.save_session("history")
+    manager.save_session_pretty("pretty")
+    
+    for name in ("history", "pretty"):
+        info = manager.get_session_info(name)
+        assert info["name"] == name
+        assert info["message_count"] == 1
+    
+    session_file = tmp_path / "broken_session.json"
+    session_file.write_bytes(b'{"name":"broken","message_count":3,"history":[{"role":')
+    assert manager.get_session_info("broken")["message_count"] == 3
+
+
+def test_load_session_tail_and_older(session_manager):
+    """测试按页加载会话历史"""
+    manager = session_manager
+    for i in range(8):
+        manager.add_user_message(f"消息 {i}")
+    manager.save_session("paged")
+    
+    manager.load_session("paged", tail=3)
+    assert [m["content"] for m in manager.get_context()] == ["消息 5", "消息 6", "消息 7"]
+    
+    assert [m["content"] for m in manager.load_older(2)] == ["消息 3", "消息 4"]
+    assert [m["content"] for m in manager.load_older(10)] == ["消息 0", "消息 1", "消息 2"]
+    assert manager.load_older() == []
+
+
+def test_save_after_tail_load_keeps_older_messages(session_manager, tmp_path):
+    """测试部分加载会话后以原名称保存不丢失较早消息"""
+    manager = session_manager
+    for i in range(30):
+        manager.add_user_message(f"消息 {i}")
+    manager.save_session("partial")
+    
+    manager.load_session("partial", tail=5)
+    manager.add_user_message("新消息")
+    manager.save_session("partial")
+    
+    assert manager.get_session_info("partial")["message_count"] == 31
+    assert [m["content"] for m in manager.load_older(5)] == [f"消息 {i}" for i in range(20, 25)]
+    
+    manager.load_session("partial")
+    assert manager.get_context()[-1]["content"] == "新消息"
+    assert manager.get_context()[-2]["content"] == "消息 29"
+
+
+def test_context_summary_uses_returned_window(conversation):
+    """测试总结只在返回超过5条消息时添加,话题按返回窗口统计"""
+    conversation.add_user_message("帮我搜索绘图软件")
+    for i in range(6):
+        conversation.add_user_message(f"第 {i} 句")
+    
+    assert conversation.get_context_with_summary(max_messages=5) == conversation.get_context(5)
+    
+    summary = conversation.get_context_with_summary(max_messages=6)[0]["content"]
+    assert "主要话题: 通用咨询" in summary
+    
+    summary = conversation.get_context_with_summary()[0]["content"]
+    assert "已进行 7 轮对话" in summary
+    assert "主要话题: 软件" in summary
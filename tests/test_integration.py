@@ -85,6 +85,37 @@ class TestPackageSearchIntegration:
         
         mock_ai_instance.analyze_intent.assert_called_once()
         mock_search.assert_called_once_with('绘图')
+    
+    @patch('infrastructure.brew_executor.brew.info')
+    def test_cached_package_info_returns_copies(self, mock_info, tmp_path):
+        """
+        测试内存缓存命中时返回Package副本,修改返回值不会影响缓存
+        """
+        mock_info.return_value = {
+            'name': 'drawio',
+            'desc': 'Diagram editor',
+            'version': '21.0.0',
+            'license': 'Apache-2.0',
+            'homepage': 'https://draw.io'
+        }
+        
+        repo = PackageRepository()
+        repo.cache_dir = tmp_path
+        repo._installed_cache = set()
+        
+        first = repo.get_package_info('drawio')
+        first.is_installed = True
+        first.dependencies.append('java')
+        
+        second = repo.get_package_info('drawio')
+        assert second is not first
+        assert second.is_installed is False
+        assert second.dependencies == []
+        
+        many = repo.get_package_info_many(['drawio'])
+        assert many['drawio'] is not second
+        assert many['drawio'].dependencies == []
+        mock_info.assert_called_once_with('drawio')
 
 
 class TestConversationIntegration:
@@ -134,17 +165,16 @@ class TestMacControlIntegration:
     测试Mac系统控制的流程(使用mock)
     """
     
-    @patch('infrastructure.mac_controller.platform.system')
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.psutil', None)
     @patch('infrastructure.mac_controller.subprocess.run')
-    def test_app_control_flow(self, mock_run, mock_system):
+    def test_app_control_flow(self, mock_run):
         """
         测试应用控制流程: 打开应用 → 查询状态 → 关闭应用
         """
-        mock_system.return_value = 'Darwin'
-        
         mock_result = Mock()
-        mock_result.stdout = ''
-        mock_result.stderr = ''
+        mock_result.stdout = b''
+        mock_result.stderr = b''
         mock_run.return_value = mock_result
         
         controller = MacController()
@@ -152,12 +182,128 @@ class TestMacControlIntegration:
         controller.open_app("Safari")
         mock_run.assert_called()
         
-        mock_result.stdout = 'true'
+        mock_result.stdout = b'true'
         is_running = controller.is_app_running("Safari")
         assert is_running == True
         
         controller.quit_app("Safari")
         mock_run.assert_called()
+    
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.psutil', None)
+    @patch('infrastructure.mac_controller.subprocess.run')
+    def test_app_name_passed_as_argument(self, mock_run):
+        """
+        测试应用名作为osascript参数传入,不拼接进脚本
+        """
+        mock_result = Mock()
+        mock_result.stdout = b'true'
+        mock_result.stderr = b''
+        mock_run.return_value = mock_result
+        
+        controller = MacController()
+        controller._running_cache.clear()
+        controller.is_app_running('My "App"')
+        
+        command = mock_run.call_args[0][0]
+        assert command[-1] == 'My "App"', "应用名应作为argv传入"
+        assert 'My "App"' not in command[2], "脚本文本中不应包含应用名"
+    
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.psutil', None)
+    @patch('infrastructure.mac_controller.subprocess.run')
+    def test_batch_app_names_passed_as_arguments(self, mock_run):
+        """
+        测试批量关闭和批量查询Bundle ID时应用名作为argv传入,脚本文本固定
+        """
+        mock_result = Mock()
+        mock_result.stdout = b'true\ntrue'
+        mock_result.stderr = b''
+        mock_run.return_value = mock_result
+        
+        controller = MacController()
+        names = ['My "App"', 'Notes']
+        
+        assert controller.quit_apps(names) == {'My "App"': True, 'Notes': True}
+        command = mock_run.call_args[0][0]
+        assert command[3:] == names
+        assert 'My "App"' not in command[2]
+        
+        mock_result.stdout = b'com.example.app\n-'
+        controller._bundle_cache.clear()
+        assert controller.get_app_bundle_ids(names) == {'My "App"': 'com.example.app', 'Notes': None}
+        command = mock_run.call_args[0][0]
+        assert command[3:] == names
+        assert 'My "App"' not in command[2]
+    
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.psutil')
+    @patch('infrastructure.mac_controller.subprocess.run')
+    def test_running_state_prefers_psutil(self, mock_run, mock_psutil):
+        """
+        测试psutil可用时直接读取进程表,不调用osascript
+        """
+        mock_psutil.process_iter.return_value = [
+            Mock(info={'name': 'Finder'}),
+            Mock(info={'name': 'Safari'}),
+            Mock(info={'name': None}),
+        ]
+        
+        controller = MacController()
+        controller._running_cache.clear()
+        
+        assert controller.is_app_running('Safari') is True
+        assert controller.is_app_running('Notes') is False
+        assert controller.get_running_apps() == ['Finder', 'Safari']
+        mock_run.assert_not_called()
+    
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.psutil', None)
+    @patch('infrastructure.mac_controller.subprocess.run')
+    def test_running_state_reuses_app_list(self, mock_run):
+        """
+        测试刚获取过应用列表时,is_app_running直接复用,不再执行脚本
+        """
+        mock_result = Mock()
+        mock_result.stdout = b'Finder\nSafari'
+        mock_result.stderr = b''
+        mock_run.return_value = mock_result
+        
+        controller = MacController()
+        controller._running_cache.clear()
+        
+        assert controller.get_running_apps() == ['Finder', 'Safari']
+        assert controller.is_app_running('Safari') is True
+        assert controller.is_app_running('Notes') is False
+        assert mock_run.call_count == 1, "应该只执行一次osascript"
+    
+    @patch('infrastructure.mac_controller.subprocess.Popen')
+    def test_coprocess_respawns_after_broken_pipe(self, mock_popen):
+        """
+        测试常驻osascript进程写入失败后本次回退,下次调用重新启动,不会永久停用
+        """
+        broken = MagicMock()
+        broken.poll.return_value = None
+        broken.stdin.write.side_effect = BrokenPipeError()
+        
+        healthy = MagicMock()
+        healthy.poll.return_value = None
+        healthy.stdout.readline.return_value = '{"ok": true, "output": "done"}\n'
+        
+        mock_popen.side_effect = [broken, healthy]
+        
+        controller = MacController()
+        controller._osa = None
+        controller._osa_disabled = False
+        controller._osa_failures = 0
+        try:
+            assert controller._execute_in_coprocess('return 1', 5) is None
+            assert controller._osa_disabled is False
+            assert controller._execute_in_coprocess('return 1', 5) == 'done'
+            assert mock_popen.call_count == 2, "应该重新启动常驻进程"
+            assert controller._osa_failures == 0
+        finally:
+            controller._osa = None
 
 
 class TestCLIIntegration:
@@ -257,16 +403,15 @@ class TestNotificationIntegration:
     测试通知相关功能的完整流程
     """
     
-    @patch('infrastructure.mac_controller.platform.system')
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
     @patch('infrastructure.mac_controller.subprocess.run')
-    def test_notification_send_flow(self, mock_run, mock_system):
+    def test_notification_send_flow(self, mock_run):
         """
         测试发送通知流程
         """
-        mock_system.return_value = 'Darwin'
         mock_result = Mock()
-        mock_result.stdout = ''
-        mock_result.stderr = ''
+        mock_result.stdout = b''
+        mock_result.stderr = b''
         mock_run.return_value = mock_result
         
         controller = MacController()
@@ -279,13 +424,36 @@ class TestNotificationIntegration:
         assert success == True
         mock_run.assert_called()
     
-    @patch('infrastructure.mac_controller.platform.system')
-    def test_notification_settings_guide(self, mock_system):
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    @patch('infrastructure.mac_controller.subprocess.run')
+    def test_notification_batch_single_call(self, mock_run):
         """
-        测试通知设置引导流程
+        测试批量通知只执行一次脚本
         """
-        mock_system.return_value = 'Darwin'
+        mock_result = Mock()
+        mock_result.stdout = b''
+        mock_result.stderr = b''
+        mock_run.return_value = mock_result
         
+        controller = MacController()
+        success = controller.send_notifications([
+            {"title": "MacMind", "message": "drawio已安装"},
+            {"title": "MacMind", "message": "vim已安装", "subtitle": "编辑器", "sound": False},
+        ])
+        
+        assert success == True
+        assert mock_run.call_count == 1, "批量通知应该只执行一次osascript"
+        command = mock_run.call_args[0][0]
+        assert command[3:] == [
+            "drawio已安装", "MacMind", "", "1",
+            "vim已安装", "MacMind", "编辑器", "0",
+        ]
+    
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    def test_notification_settings_guide(self):
+        """
+        测试通知设置引导流程
+        """
         controller = MacController()
         guide = controller.enable_app_notifications("Safari")
         
@@ -301,13 +469,11 @@ class TestShortcutIntegration:
     测试快捷键相关功能的完整流程
     """
     
-    @patch('infrastructure.mac_controller.platform.system')
-    def test_shortcut_guide_generation(self, mock_system):
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    def test_shortcut_guide_generation(self):
         """
         测试快捷键引导生成
         """
-        mock_system.return_value = 'Darwin'
-        
         controller = MacController()
         guide = controller.create_keyboard_shortcut_guide(
             "Command+Shift+L",
@@ -321,13 +487,11 @@ class TestShortcutIntegration:
         assert "WPS" in guide
         assert "Automator" in guide or "Hammerspoon" in guide
     
-    @patch('infrastructure.mac_controller.platform.system')
-    def test_shortcut_conflict_check(self, mock_system):
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    def test_shortcut_conflict_check(self):
         """
         测试快捷键冲突检查
         """
-        mock_system.return_value = 'Darwin'
-        
         controller = MacController()
         
         result = controller.check_keyboard_shortcut_conflicts("Command+L")
@@ -384,13 +548,15 @@ class TestConversationPromptIntegration:
         manager.clear_history()
         
         manager.add_user_message("帮我搜索绘图软件")
+        manager.add_assistant_message("推荐drawio")
         manager.add_user_message("打开Safari")
+        manager.add_assistant_message("已打开")
         manager.add_user_message("关闭通知")
+        manager.add_assistant_message("已关闭")
         
-        messages = manager.get_context()
-        topics = manager._extract_topics(messages)
+        summary = manager.get_context_with_summary()[0]["content"]
         
-        assert "软件" in topics or "系统控制" in topics or "通知管理" in topics
+        assert "软件" in summary or "系统控制" in summary or "通知管理" in summary
 
 
 class TestAdvancedIntegrationScenarios:
@@ -402,15 +568,14 @@ class TestAdvancedIntegrationScenarios:
     
     @patch('infrastructure.brew_executor.brew')
     @patch('infrastructure.mac_controller.subprocess.run')
-    @patch('infrastructure.mac_controller.platform.system')
-    def test_install_and_notify_flow(self, mock_system, mock_subprocess, mock_brew):
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    def test_install_and_notify_flow(self, mock_subprocess, mock_brew):
         """
         测试安装软件后发送通知的完整流程
         """
-        mock_system.return_value = 'Darwin'
         mock_subprocess_result = Mock()
-        mock_subprocess_result.stdout = ''
-        mock_subprocess_result.stderr = ''
+        mock_subprocess_result.stdout = b''
+        mock_subprocess_result.stderr = b''
         mock_subprocess.return_value = mock_subprocess_result
         
         mock_brew.search.return_value = ['drawio']
@@ -435,13 +600,11 @@ class TestAdvancedIntegrationScenarios:
         )
         assert notification_sent == True
     
-    @patch('infrastructure.mac_controller.platform.system')
-    def test_conversation_with_context(self, mock_system, tmp_path):
+    @patch('infrastructure.mac_controller._IS_MACOS', True)
+    def test_conversation_with_context(self, tmp_path):
         """
         测试带上下文的多轮对话流程
         """
-        mock_system.return_value = 'Darwin'
-        
         manager = ConversationManager()
         manager.session_dir = tmp_path
         manager.clear_history()
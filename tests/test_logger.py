@@ -10,6 +10,7 @@
 
 import pytest
 import logging
+from logging.handlers import QueueHandler
 from pathlib import Path
 from datetime import datetime
 from infrastructure.logger import Logger, logger
@@ -57,7 +58,9 @@ class TestLoggerSetup:
     def test_logger_has_handlers(self):
         """测试logger是否配置了处理器"""
         test_logger = Logger()
-        assert len(test_logger.logger.handlers) >= 2, "应该有至少2个处理器(控制台+文件)"
+        assert any(isinstance(h, QueueHandler) for h in test_logger.logger.handlers), \
+            "logger应该通过QueueHandler异步输出"
+        assert len(test_logger._listener.handlers) >= 2, "应该有至少2个处理器(控制台+文件)"
 
 
 class TestLoggerMethods:
@@ -109,6 +112,7 @@ class TestLoggerOutput:
         """测试日志消息是否写入文件"""
         test_message = f"测试消息_{datetime.now().timestamp()}"
         logger.info(test_message)
+        logger.flush()
         
         log_dir = Path.home() / '.macmind' / 'logs'
         log_file = log_dir / f"macmind_{datetime.now().strftime('%Y%m%d')}.log"
@@ -49,3 +49,10 @@ def test_singleton_pattern():
     controller2 = MacController()
     
     assert controller1 is controller2
+
+
+def test_escape_applescript_string(controller):
+    """测试AppleScript字符串转义(反斜杠不会被重复转义)"""
+    assert controller._escape_applescript_string('a"b') == 'a\\"b'
+    assert controller._escape_applescript_string('a\\b') == 'a\\\\b'
+    assert controller._escape_applescript_string('\\"') == '\\\\\\"'
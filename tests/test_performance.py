@@ -103,6 +103,79 @@ class TestCachePerformance:
         print(f"平均每个包: {avg_time*1000:.2f}ms")
         
         assert avg_time < 0.1
+    
+    @patch('infrastructure.brew_executor.brew.info')
+    @patch('infrastructure.brew_executor.brew.info_batch')
+    def test_batch_lookup_reads_cache_in_one_pass(self, mock_info_batch, mock_info, tmp_path):
+        """
+        测试批量查询命中缓存
+        
+        验证:
+        缓存过的包由一次批量读取返回,不再调用brew info
+        """
+        mock_info_batch.side_effect = RuntimeError("batch unavailable")
+        mock_info.side_effect = lambda name: {
+            'name': name,
+            'desc': 'Test package',
+            'version': '1.0',
+            'license': 'MIT'
+        }
+        
+        repo = PackageRepository()
+        repo.cache_dir = tmp_path
+        
+        packages = [f'package{i}' for i in range(10)]
+        first = repo.get_package_info_many(packages)
+        assert mock_info.call_count == 10
+        
+        second = repo.get_package_info_many(packages + ['package0'])
+        assert mock_info_batch.call_count == 1
+        assert mock_info.call_count == 10
+        assert list(second) == packages
+        assert [p.name for p in second.values()] == [p.name for p in first.values()]
+    
+    @patch('infrastructure.brew_executor.brew.info')
+    @patch('infrastructure.brew_executor.brew.info_batch')
+    def test_batch_lookup_fetches_misses_in_one_call(self, mock_info_batch, mock_info, tmp_path):
+        """
+        测试批量查询合并未命中的包
+        
+        验证:
+        未缓存的包由一次brew info批量调用获取,不再逐个调用
+        """
+        mock_info_batch.side_effect = lambda names: {
+            name: {'name': name, 'desc': 'Test package', 'version': '1.0', 'license': 'MIT'}
+            for name in names
+        }
+        
+        repo = PackageRepository()
+        repo.cache_dir = tmp_path
+        
+        packages = [f'package{i}' for i in range(10)]
+        results = repo.get_package_info_many(packages)
+        
+        assert mock_info_batch.call_count == 1
+        assert mock_info.call_count == 0
+        assert [p.name for p in results.values()] == packages
+    
+    def test_installed_snapshot_reused_across_instances(self, tmp_path):
+        """
+        测试已安装包快照
+        
+        验证:
+        新建的Repository从磁盘快照读取已安装列表,不再调用包管理器
+        """
+        repo = PackageRepository()
+        repo.cache_dir = tmp_path
+        repo.package_manager = Mock()
+        repo.package_manager.list_installed.return_value = ['wget', 'git']
+        assert repo.list_installed() == ['wget', 'git']
+        
+        fresh = PackageRepository()
+        fresh.cache_dir = tmp_path
+        fresh.package_manager = Mock()
+        assert sorted(fresh.list_installed()) == ['git', 'wget']
+        fresh.package_manager.list_installed.assert_not_called()
 
 
 class TestConversationPerformance: